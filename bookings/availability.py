@@ -0,0 +1,138 @@
+import threading
+import time
+from bisect import bisect_right
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import Booking
+
+
+class IntervalIndex:
+    """
+    Static index over closed date intervals.
+
+    Intervals are sorted by start and paired with a running maximum of their
+    ends, so an overlap test is one binary search: among the intervals that
+    start on or before the end of the query, is the latest end on or after
+    its start?
+    """
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals)
+        self.starts = [start for start, _ in intervals]
+        self.max_ends = []
+        latest = None
+        for _, end in intervals:
+            latest = end if latest is None or end > latest else latest
+            self.max_ends.append(latest)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlaps(self, start, end):
+        i = bisect_right(self.starts, end)
+        return i > 0 and self.max_ends[i - 1] >= start
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def room_bookings(room_id):
+    return Booking.objects.filter(
+        room_id=room_id,
+        kind=Booking.BookingKindChoices.ROOM,
+        check_in__isnull=False,
+        check_out__isnull=False,
+    )
+
+
+def get_room_index(room_id):
+    now = time.monotonic()
+    with _lock:
+        cached = _indexes.get(room_id)
+    if cached and cached[1] > now:
+        return cached[0]
+    index = IntervalIndex(room_bookings(room_id).values_list("check_in", "check_out"))
+    with _lock:
+        _indexes[room_id] = (index, now + settings.AVAILABILITY_CACHE_TTL)
+    return index
+
+
+def invalidate_room(room_id=None):
+    with _lock:
+        if room_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(room_id, None)
+
+
+def invalidate_room_on_commit(room_id=None):
+    # Drop the index now and again once the change is visible, so a rebuild
+    # from a concurrent reader can't cache the pre-commit state.
+    invalidate_room(room_id)
+    transaction.on_commit(lambda: invalidate_room(room_id))
+
+
+def lock_room(room):
+    """
+    Serialize booking writes for one room until the end of the transaction.
+
+    Uses SELECT ... FOR UPDATE on the room row where supported. SQLite has no
+    row locks, so a no-op UPDATE takes its database write lock instead.
+    """
+    rooms = type(room).objects.filter(pk=room.pk)
+    if connection.features.has_select_for_update:
+        list(rooms.select_for_update().values_list("pk"))
+    else:
+        rooms.update(id=F("id"))
+
+
+def is_room_available(room, check_in, check_out, locked=False):
+    """
+    On PostgreSQL the overlap query is answered by the composite index (and
+    guarded by the exclusion constraint). Elsewhere (the SQLite dev setup)
+    an in-process interval index per room is used for read-only checks.
+
+    Pass `locked` under lock_room(): the decision to write must see the
+    bookings other processes committed, which the per-process index may
+    not have seen yet, so the database is always queried.
+    """
+    if locked or connection.vendor == "postgresql":
+        return not (
+            room_bookings(room.pk)
+            .filter(check_in__lte=check_out, check_out__gte=check_in)
+            .exists()
+        )
+    return not get_room_index(room.pk).overlaps(check_in, check_out)
+
+
+def booked_ranges(room_ids, start, end):
+    """
+    Booked days of many rooms inside [start, end], in one query.
+
+    Returns {room_id: [[first_day, last_day], ...]} with overlapping or
+    adjacent bookings merged and clipped to the window.
+    """
+    ranges = {room_id: [] for room_id in room_ids}
+    bookings = (
+        Booking.objects.filter(
+            room_id__in=room_ids,
+            kind=Booking.BookingKindChoices.ROOM,
+            check_in__lte=end,
+            check_out__gte=start,
+        )
+        .order_by("room_id", "check_in")
+        .values_list("room_id", "check_in", "check_out")
+    )
+    for room_id, check_in, check_out in bookings:
+        check_in, check_out = max(check_in, start), min(check_out, end)
+        room_ranges = ranges[room_id]
+        if room_ranges and check_in <= room_ranges[-1][1] + timedelta(days=1):
+            room_ranges[-1][1] = max(room_ranges[-1][1], check_out)
+        else:
+            room_ranges.append([check_in, check_out])
+    return ranges
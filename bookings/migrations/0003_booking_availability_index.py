@@ -0,0 +1,77 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+OVERLAPS_SQL = """
+    SELECT a.room_id, a.id, b.id
+    FROM bookings_booking a
+    JOIN bookings_booking b ON b.room_id = a.room_id AND b.id > a.id
+    WHERE a.kind = 'room' AND b.kind = 'room'
+    AND a.check_in IS NOT NULL AND a.check_out IS NOT NULL
+    AND b.check_in IS NOT NULL AND b.check_out IS NOT NULL
+    AND a.check_in <= b.check_out AND b.check_in <= a.check_out
+    ORDER BY a.room_id, a.id, b.id
+    LIMIT 50
+"""
+
+
+def check_overlaps(schema_editor):
+    # ADD CONSTRAINT ... EXCLUDE fails on existing overlaps, with nothing to
+    # tell which rows. List them instead, and let whoever deploys decide
+    # which booking of each pair to keep: they are real reservations, so
+    # the migration doesn't pick one itself.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(OVERLAPS_SQL)
+        overlaps = cursor.fetchall()
+    if overlaps:
+        pairs = "\n".join(
+            f"  room {room_id}: bookings {first} and {second}"
+            for room_id, first, second in overlaps
+        )
+        raise RuntimeError(
+            "Overlapping room bookings would violate bookings_room_no_overlap "
+            f"(first {len(overlaps)} shown):\n{pairs}\n"
+            "Cancel or move one booking of each pair (e.g. delete it, or set "
+            "its check_in / check_out to free dates), then run migrate again."
+        )
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    check_overlaps(schema_editor)
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    schema_editor.execute(
+        "ALTER TABLE bookings_booking ADD CONSTRAINT bookings_room_no_overlap "
+        "EXCLUDE USING gist (room_id WITH =, daterange(check_in, check_out, '[]') WITH &&) "
+        "WHERE (kind = 'room' AND room_id IS NOT NULL "
+        "AND check_in IS NOT NULL AND check_out IS NOT NULL)"
+    )
+
+
+def remove_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "ALTER TABLE bookings_booking DROP CONSTRAINT IF EXISTS bookings_room_no_overlap"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_alter_booking_experience_alter_booking_room_and_more'),
+        ('experiences', '0004_rating_aggregates'),
+        ('rooms', '0008_rating_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['room', 'check_in', 'check_out'], name='bookings_bo_room_id_9b7de4_idx'),
+        ),
+        migrations.RunPython(add_exclusion_constraint, remove_exclusion_constraint),
+    ]
@@ -51,5 +51,10 @@ class Booking(CommonModel):
         ]
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["room", "check_in", "check_out"]),
+        ]
+
     def __str__(self) -> str:
         return "%s  / %s" % (self.kind.title(), self.user)
@@ -7,6 +7,11 @@ from rest_framework.serializers import ModelSerializer, DateField, ValidationErr
 # Model Imports
 from .models import Booking
 
+# Availability Imports
+from .availability import is_room_available
+
+DATES_TAKEN = "Those (or some) of those dates are already taken."
+
 
 class CreateRoomBookingSerializer(ModelSerializer):
 
@@ -37,12 +42,13 @@ class CreateRoomBookingSerializer(ModelSerializer):
         room = self.context.get("room")
         if data["check_in"] >= data["check_out"]:
             raise ValidationError("Check in should be smaller than check out.")
-        if Booking.objects.filter(
-            room=room,
-            check_in__lte=data["check_out"],
-            check_out__gte=data["check_in"],
-        ).exists():
-            raise ValidationError("Those (or some) of those dates are already taken.")
+        if not is_room_available(
+            room,
+            data["check_in"],
+            data["check_out"],
+            locked=self.context.get("locked", False),
+        ):
+            raise ValidationError(DATES_TAKEN)
         return data
 
 
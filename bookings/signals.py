@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .availability import invalidate_room_on_commit
+from .models import Booking
+
+
+@receiver(post_save, sender=Booking)
+def invalidate_availability_on_save(sender, instance, created, **kwargs):
+    # An update may have moved the booking away from another room.
+    invalidate_room_on_commit(instance.room_id if created else None)
+
+
+@receiver(post_delete, sender=Booking)
+def invalidate_availability_on_delete(sender, instance, **kwargs):
+    invalidate_room_on_commit(instance.room_id)
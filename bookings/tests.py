@@ -1,3 +1,213 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from threading import Barrier
 
-# Create your tests here.
+from django.db import connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+
+from rooms.testing import create_room
+from users.models import User
+from .availability import IntervalIndex, invalidate_room
+from .models import Booking
+
+
+class TestIntervalIndex(APITestCase):
+    def test_overlaps(self):
+        index = IntervalIndex(
+            [
+                (date(2024, 1, 10), date(2024, 1, 12)),
+                (date(2024, 1, 1), date(2024, 1, 20)),
+                (date(2024, 2, 1), date(2024, 2, 3)),
+            ]
+        )
+        self.assertTrue(index.overlaps(date(2024, 1, 15), date(2024, 1, 16)))
+        self.assertTrue(index.overlaps(date(2024, 1, 20), date(2024, 1, 25)))
+        self.assertTrue(index.overlaps(date(2024, 1, 25), date(2024, 2, 1)))
+        self.assertFalse(index.overlaps(date(2024, 1, 21), date(2024, 1, 31)))
+        self.assertFalse(index.overlaps(date(2023, 12, 1), date(2023, 12, 31)))
+        self.assertFalse(IntervalIndex([]).overlaps(date(2024, 1, 1), date(2024, 1, 2)))
+
+
+class TestRoomBookingCheck(APITestCase):
+    def setUp(self):
+        invalidate_room()
+        self.user = User.objects.create(username="test")
+        self.room = create_room(self.user)
+        self.today = timezone.localtime(timezone.now()).date()
+        self.url = f"/api/v1/rooms/{self.room.pk}/bookings/check"
+
+    def book(self, start, end, kind=Booking.BookingKindChoices.ROOM):
+        return Booking.objects.create(
+            kind=kind,
+            user=self.user,
+            room=self.room,
+            check_in=self.today + timedelta(days=start),
+            check_out=self.today + timedelta(days=end),
+            guests=1,
+        )
+
+    def check(self, start, end):
+        response = self.client.get(
+            self.url,
+            {
+                "check_in": self.today + timedelta(days=start),
+                "check_out": self.today + timedelta(days=end),
+            },
+        )
+        return response.json()["ok"]
+
+    def test_check(self):
+        self.assertTrue(self.check(1, 3))
+        self.book(2, 4)
+        self.assertFalse(self.check(1, 3))
+        self.assertTrue(self.check(5, 7))
+
+        booking = self.book(5, 6, kind=Booking.BookingKindChoices.EXPERIENCE)
+        self.assertTrue(self.check(5, 7))
+
+        booking.kind = Booking.BookingKindChoices.ROOM
+        booking.save()
+        self.assertFalse(self.check(5, 7))
+        booking.delete()
+        self.assertTrue(self.check(5, 7))
+
+    def test_booking_reads_database(self):
+        self.assertTrue(self.check(1, 3))
+        # Booked through another process: this one's index is not invalidated.
+        Booking.objects.bulk_create(
+            [
+                Booking(
+                    kind=Booking.BookingKindChoices.ROOM,
+                    user=self.user,
+                    room=self.room,
+                    check_in=self.today + timedelta(days=2),
+                    check_out=self.today + timedelta(days=4),
+                    guests=1,
+                )
+            ]
+        )
+        if connection.vendor == "sqlite":
+            # Read-only checks still use the stale index.
+            self.assertTrue(self.check(1, 3))
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            f"/api/v1/rooms/{self.room.pk}/bookings/",
+            {
+                "check_in": self.today + timedelta(days=1),
+                "check_out": self.today + timedelta(days=3),
+                "guests": 1,
+            },
+        )
+        self.assertNotIn("pk", response.json())
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_invalid_dates(self):
+        response = self.client.get(self.url, {"check_in": "nope"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            self.url,
+            {
+                "check_in": self.today + timedelta(days=3),
+                "check_out": self.today + timedelta(days=1),
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class TestRoomsBookingCalendar(APITestCase):
+    URL = "/api/v1/rooms/bookings/calendar"
+
+    def setUp(self):
+        self.user = User.objects.create(username="test")
+        self.rooms = [create_room(self.user, f"Room {i}") for i in range(2)]
+        for check_in, check_out in (
+            (date(2024, 1, 1), date(2024, 1, 3)),
+            (date(2024, 1, 4), date(2024, 1, 6)),
+            (date(2024, 1, 10), date(2024, 1, 20)),
+        ):
+            Booking.objects.create(
+                kind=Booking.BookingKindChoices.ROOM,
+                user=self.user,
+                room=self.rooms[0],
+                check_in=check_in,
+                check_out=check_out,
+                guests=1,
+            )
+
+    def test_calendar(self):
+        first, second = self.rooms
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.URL,
+                {
+                    "rooms": f"{first.pk},{second.pk}",
+                    "start": "2024-01-02",
+                    "end": "2024-01-15",
+                },
+            )
+        self.assertEqual(
+            response.json(),
+            {
+                str(first.pk): [
+                    ["2024-01-02", "2024-01-06"],
+                    ["2024-01-10", "2024-01-15"],
+                ],
+                str(second.pk): [],
+            },
+        )
+
+    def test_invalid_params(self):
+        response = self.client.get(self.URL, {"start": "2024-01-02", "end": "2024-01-15"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            self.URL, {"rooms": "1", "start": "2024-01-02", "end": "2026-01-15"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class TestConcurrentRoomBookings(TransactionTestCase):
+
+    WORKERS = 8
+
+    def setUp(self):
+        invalidate_room()
+        self.user = User.objects.create(username="test")
+        self.rooms = [create_room(self.user, f"Room {i}") for i in range(2)]
+        self.today = timezone.localtime(timezone.now()).date()
+
+    def fire(self, room_for_worker):
+        """Fire WORKERS booking requests at once and return the responses."""
+        barrier = Barrier(self.WORKERS)
+
+        def book(worker):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            barrier.wait()
+            try:
+                return client.post(
+                    f"/api/v1/rooms/{room_for_worker(worker).pk}/bookings/",
+                    {
+                        "check_in": self.today + timedelta(days=1),
+                        "check_out": self.today + timedelta(days=3),
+                        "guests": 1,
+                    },
+                )
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(self.WORKERS) as executor:
+            return list(executor.map(book, range(self.WORKERS)))
+
+    def test_exactly_one_wins(self):
+        responses = self.fire(lambda worker: self.rooms[0])
+        winners = [response for response in responses if "pk" in response.json()]
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(Booking.objects.filter(room=self.rooms[0]).count(), 1)
+
+    def test_different_rooms_dont_conflict(self):
+        responses = self.fire(lambda worker: self.rooms[worker % 2])
+        winners = [response for response in responses if "pk" in response.json()]
+        self.assertEqual(len(winners), 2)
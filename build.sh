@@ -10,3 +10,6 @@ python manage.py collectstatic --no-input
 
 # Apply any outstanding database migrations
 python manage.py migrate
+
+# Create the table of a dbcache:// CACHE_URL, if any
+python manage.py createcachetable
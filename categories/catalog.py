@@ -0,0 +1,5 @@
+from common.catalog import Catalog
+
+from .models import Category
+
+category_catalog = Catalog(Category)
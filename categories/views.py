@@ -1,4 +1,6 @@
 from rest_framework.viewsets import ModelViewSet
+from common.conditional import conditional_response, get_rows_version
+from .catalog import category_catalog
 from .models import Category
 from .serializers import CategorySerializer
 
@@ -9,3 +11,17 @@ class CategoryViewSet(ModelViewSet):
 
     serializer_class = CategorySerializer
     queryset = Category.objects.filter(kind=Category.CategoryKindChoices.ROOMS)
+
+    def list(self, request, *args, **kwargs):
+        categories = [
+            category
+            for category in category_catalog.all()
+            if category.kind == Category.CategoryKindChoices.ROOMS
+        ]
+        return conditional_response(
+            request,
+            ("categories",),
+            [Category],
+            lambda: get_rows_version(categories),
+            lambda: self.get_serializer(categories, many=True).data,
+        )
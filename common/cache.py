@@ -0,0 +1,168 @@
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.db import transaction
+
+_MISSING = object()
+
+
+class LocalCache:
+    """
+    Thread-safe in-process LRU cache whose entries expire after `ttl` seconds
+    (never when `ttl` is None).
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value, expires_at = self._data.get(key, (_MISSING, 0))
+            if value is _MISSING:
+                return default
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def generation_key(model, pk=None):
+    """The key of a model's generation, or of one object's with `pk`."""
+    if pk is None:
+        return make_key("generations", model._meta.label_lower)
+    return make_key("generations", model._meta.label_lower, pk)
+
+
+def get_generations(sources):
+    """
+    The current generation of each model, or (model, pk) pair for one
+    object, from one get_many on the default cache. Keys built from them
+    stop matching once it changes, see bump_generation().
+    """
+    keys = [
+        generation_key(*source) if isinstance(source, tuple) else generation_key(source)
+        for source in sources
+    ]
+    generations = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in generations}
+    if missing:
+        cache.set_many(missing, None)
+        generations.update(missing)
+    return [generations[key] for key in keys]
+
+
+def _bump(keys):
+    # New values rather than increments, so a lost key never brings an old
+    # generation back. Again after the commit, so a read racing with the
+    # transaction can't cache the old rows under the new generation.
+    def bump():
+        cache.set_many({key: time.time_ns() for key in keys}, None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def bump_generation(*models):
+    _bump([generation_key(model) for model in models])
+
+
+def bump_object_generations(model, *pks):
+    """Like bump_generation() for some objects of `model` only."""
+    if pks:
+        _bump([generation_key(model, pk) for pk in pks])
+
+
+def make_key(namespace, *parts):
+    """
+    `namespace:part:...`, hashed when it could be an invalid memcached key:
+    too close to 250 characters once prefixed, spaces or control characters.
+    """
+    key = ":".join(str(part) for part in (namespace, *parts))
+    if len(key) > 200 or any(ord(char) <= 32 or ord(char) == 127 for char in key):
+        key = f"{namespace}:{hashlib.sha256(key.encode()).hexdigest()}"
+    return key
+
+
+class CacheNamespace:
+    """
+    The keys of one feature in a Django cache (CACHES[alias]).
+
+    get_or_set() guards against stampedes with probabilistic early
+    expiration: every reader may recompute an entry before it expires, with
+    a probability growing as expiry nears and with how long the entry took
+    to compute, so a hot key is usually refreshed by one worker while the
+    others keep reading the old value.
+    """
+
+    def __init__(self, name, alias=DEFAULT_CACHE_ALIAS, beta=1.0):
+        self.name = name
+        self.alias = alias
+        self.beta = beta
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, key):
+        """`key` is a value or a tuple of values."""
+        parts = key if isinstance(key, tuple) else (key,)
+        return make_key(self.name, *parts)
+
+    def get(self, key, default=None):
+        return self.cache.get(self.make_key(key), default)
+
+    def set(self, key, value, ttl=None):
+        self.cache.set(self.make_key(key), value, ttl)
+
+    def delete(self, key):
+        self.cache.delete(self.make_key(key))
+
+    def get_or_set(self, key, compute, ttl):
+        """
+        The value cached under `key`, else compute() cached for `ttl`
+        seconds (forever if None, not at all if 0). Entries are stored with
+        their computation time, so use get_or_set() alone on a key.
+        """
+        if ttl == 0:
+            return compute()
+        key = self.make_key(key)
+        entry = self.cache.get(key)
+        if entry is not None:
+            value, delta, expires_at = entry
+            if expires_at is None or (
+                time.time() - delta * self.beta * math.log(1 - random.random())
+                < expires_at
+            ):
+                return value
+        start = time.time()
+        value = compute()
+        delta = time.time() - start
+        expires_at = None if ttl is None else start + ttl
+        self.cache.set(key, (value, delta, expires_at), ttl)
+        return value
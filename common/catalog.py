@@ -0,0 +1,55 @@
+import threading
+
+from django.core.exceptions import ValidationError
+
+from .cache import get_generations
+
+
+class Catalog:
+    """
+    A process-wide copy of a small, rarely changing table.
+
+    The rows are loaded once per process and again when the model's cache
+    generation changes, which common.signals bumps on every save and
+    delete, so every worker sees a change on its next read. A read costs
+    one cache get and no query. The instances are shared between requests
+    and must not be modified.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._loaded = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # The generation is read before the rows: a write committed in
+        # between bumps it again and the next read reloads.
+        generation = get_generations([self.model])[0]
+        loaded = self._loaded
+        if loaded is None or loaded[0] != generation:
+            with self._lock:
+                loaded = self._loaded
+                if loaded is None or loaded[0] != generation:
+                    rows = list(self.model.objects.all())
+                    loaded = (generation, rows, {row.pk: row for row in rows})
+                    self._loaded = loaded
+        return loaded
+
+    def all(self):
+        return self._load()[1]
+
+    def get(self, pk):
+        """Like model.objects.get(pk=pk), also for malformed ids."""
+        try:
+            pk = self.model._meta.pk.to_python(pk)
+        except ValidationError:
+            raise self.model.DoesNotExist
+        try:
+            return self._load()[2][pk]
+        except KeyError:
+            raise self.model.DoesNotExist
+
+    def in_bulk(self, pks):
+        """The rows of the given (integer) ids that exist, by id."""
+        rows = self._load()[2]
+        return {pk: rows[pk] for pk in pks if pk in rows}
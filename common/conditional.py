@@ -0,0 +1,81 @@
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .cache import CacheNamespace, get_generations
+
+_responses = CacheNamespace("responses")
+
+
+def get_rows_version(rows):
+    """ETag source of rows already loaded, e.g. from a Catalog."""
+    return max((row.updated_at for row in rows), default=None), len(rows)
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.sha256(repr(parts).encode()).hexdigest()[:32])
+
+
+def not_modified(request, etag, last_modified):
+    """A 304 (or 412) when the client's validators match, else None."""
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified,
+    )
+
+
+def add_validators(response, etag, last_modified, per_user=False):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    if per_user:
+        # Every header the authentication classes read.
+        patch_vary_headers(
+            response, ["Cookie", "Authorization", "Token", "Trust-Me"]
+        )
+        patch_cache_control(response, private=True)
+    return response
+
+
+def conditional_response(request, key, models, get_version, render, per_user=False):
+    """
+    Answer a GET with a 304, from the response cache, or by rendering it.
+
+    `key` identifies the representation (view, arguments, page...) and
+    `models` are the models whose writes invalidate it: cache entries are
+    keyed by their generations. Last-Modified is the time of the latest
+    of those writes, so deletes and link changes move it too. The ETag
+    comes from `get_version()`, called on a cache miss, e.g. the
+    `updated_at` and ids of the rows shown. The client's If-None-Match /
+    If-Modified-Since are checked before `render()` serializes anything.
+    """
+    key = (*key, request.accepted_renderer.format)
+    if per_user:
+        key = (*key, request.user.pk)
+    generations = get_generations(models)
+    cache_key = hashlib.sha256(repr((key, generations)).encode()).hexdigest()
+    entry = _responses.get(cache_key)
+    if entry is None:
+        entry = {
+            "etag": make_etag(key, get_version()),
+            # Generations are time_ns() values, see bump_generation().
+            "last_modified": max(generations) // 10**9,
+            "data": None,
+        }
+    response = not_modified(request, entry["etag"], entry["last_modified"])
+    if response is None:
+        if entry["data"] is None:
+            data = render()
+            # Drop the serializer the ReturnList / ReturnDict points to.
+            entry["data"] = list(data) if isinstance(data, list) else dict(data)
+            _responses.set(cache_key, entry, settings.RESPONSE_CACHE_TTL)
+        response = Response(entry["data"])
+    return add_validators(response, entry["etag"], entry["last_modified"], per_user)
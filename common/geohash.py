@@ -0,0 +1,133 @@
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+EARTH_RADIUS_KM = 6371.0088
+
+KM_PER_DEGREE = 111.32
+
+
+def encode(latitude, longitude, precision=9):
+    """
+    Geohash of a point. Cells sharing a prefix are nested, so a cell is a
+    contiguous range in a B-tree index on the hash.
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            value, interval = longitude, lng_range
+        else:
+            value, interval = latitude, lat_range
+        middle = (interval[0] + interval[1]) / 2
+        if value >= middle:
+            bits = bits * 2 + 1
+            interval[0] = middle
+        else:
+            bits = bits * 2
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """Height and width of a cell, in degrees."""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2**lat_bits, 360.0 / 2**lng_bits
+
+
+def cell_range(prefix):
+    """
+    The [low, high) range of hashes inside the cell `prefix`. `high` is None
+    when the cell is the last one ("zzz...").
+    """
+    chars = list(prefix)
+    while chars:
+        index = BASE32.index(chars[-1])
+        if index + 1 < len(BASE32):
+            chars[-1] = BASE32[index + 1]
+            return prefix, "".join(chars)
+        chars.pop()
+    return prefix, None
+
+
+def merge_ranges(ranges):
+    merged = []
+    for low, high in sorted(ranges):
+        if merged and merged[-1][1] is not None and merged[-1][1] >= low:
+            if high is None or high > merged[-1][1]:
+                merged[-1] = (merged[-1][0], high)
+        else:
+            merged.append((low, high))
+    return merged
+
+
+def covering_cells(south, west, north, east, max_cells=32):
+    """
+    The cells of the finest precision that covers the box with at most
+    `max_cells` cells. The box must not cross the antimeridian.
+    """
+    for precision in range(12, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor((north + 90) / height) - math.floor((south + 90) / height) + 1
+        columns = math.floor((east + 180) / width) - math.floor((west + 180) / width) + 1
+        if rows * columns <= max_cells or precision == 1:
+            break
+    cells = set()
+    row = math.floor((south + 90) / height)
+    while row * height - 90 <= north:
+        column = math.floor((west + 180) / width)
+        while column * width - 180 <= east:
+            latitude = min((row + 0.5) * height - 90, 90.0)
+            longitude = min((column + 0.5) * width - 180, 180.0)
+            cells.add(encode(latitude, longitude, precision))
+            column += 1
+        row += 1
+    return cells
+
+
+def neighbor_cells(latitude, longitude, precision):
+    """The cell of the point and the (up to) eight cells around it."""
+    height, width = cell_size(precision)
+    cells = set()
+    for d_lat in (-height, 0, height):
+        for d_lng in (-width, 0, width):
+            lat = latitude + d_lat
+            if not -90 <= lat <= 90:
+                continue
+            lng = (longitude + d_lng + 180) % 360 - 180
+            cells.add(encode(lat, lng, precision))
+    return cells
+
+
+def distance(lat1, lng1, lat2, lng2):
+    """Great-circle distance in kilometers."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def search_radius(latitude, precision):
+    """
+    Distance in kilometers that is guaranteed to lie inside the 3x3 block of
+    neighbor cells around a point, whatever its position in its own cell.
+    """
+    height, width = cell_size(precision)
+    latitude = min(abs(latitude) + height, 90.0)
+    return min(
+        height * KM_PER_DEGREE,
+        width * KM_PER_DEGREE * math.cos(math.radians(latitude)),
+    )
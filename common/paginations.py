@@ -0,0 +1,59 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from rest_framework.exceptions import ParseError
+
+
+def encode_cursor(obj):
+    value = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ParseError("Invalid cursor.")
+    if created_at is None:
+        raise ParseError("Invalid cursor.")
+    return created_at, pk
+
+
+def paginate_by_cursor(queryset, cursor=None, page_size=20):
+    """
+    Keyset pagination over (created_at, pk), newest first.
+
+    Returns the page items and the cursor of the next page (or None).
+    """
+    queryset = queryset.order_by("-created_at", "-pk")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+    items = list(queryset[: page_size + 1])
+    if len(items) > page_size:
+        items = items[:page_size]
+        return items, encode_cursor(items[-1])
+    return items, None
+
+
+def get_page_size(request, default, maximum):
+    try:
+        page_size = int(request.query_params.get("page_size", default))
+    except ValueError:
+        page_size = default
+    return max(1, min(page_size, maximum))
+
+
+def get_page_number(request):
+    try:
+        page = int(request.query_params.get("page", 1))
+    except ValueError:
+        page = 1
+    return max(1, page)
@@ -0,0 +1,129 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+
+class SearchIndex:
+    """
+    Full-text index over some text columns of a table.
+
+    On PostgreSQL this is a GIN index on a `to_tsvector` expression, on
+    SQLite an FTS5 external-content table kept in sync by triggers. Both are
+    updated by the database itself whenever a row is written, and `search()`
+    ranks matches with `ts_rank` / `bm25` so only matching rows are read.
+    """
+
+    def __init__(self, table, fields):
+        self.table = table
+        self.fields = fields
+        self.name = f"{table}_search"
+
+    @property
+    def document(self):
+        columns = " || ' ' || ".join(
+            f"coalesce({self.table}.{field}, '')" for field in self.fields
+        )
+        return f"to_tsvector('simple', {columns})"
+
+    def install(self, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == "postgresql":
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.name} ON {self.table} "
+                f"USING gin (({self.document.replace(self.table + '.', '')}))"
+            )
+        elif vendor == "sqlite":
+            self.install_sqlite(schema_editor)
+
+    def install_sqlite(self, schema_editor):
+        fields = ", ".join(self.fields)
+        new = ", ".join(f"new.{field}" for field in self.fields)
+        old = ", ".join(f"old.{field}" for field in self.fields)
+        insert = f"INSERT INTO {self.name}(rowid, {fields}) VALUES (new.id, {new});"
+        delete = (
+            f"INSERT INTO {self.name}({self.name}, rowid, {fields}) "
+            f"VALUES ('delete', old.id, {old});"
+        )
+        self.uninstall(schema_editor)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {self.name} USING fts5({fields}, "
+            f"content='{self.table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {self.name}_ai AFTER INSERT ON {self.table} "
+            f"BEGIN {insert} END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {self.name}_ad AFTER DELETE ON {self.table} "
+            f"BEGIN {delete} END"
+        )
+        # Only writes to the indexed columns touch the index.
+        schema_editor.execute(
+            f"CREATE TRIGGER {self.name}_au AFTER UPDATE OF {fields} "
+            f"ON {self.table} BEGIN {delete} {insert} END"
+        )
+        schema_editor.execute(f"INSERT INTO {self.name}({self.name}) VALUES ('rebuild')")
+
+    def uninstall(self, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == "postgresql":
+            schema_editor.execute(f"DROP INDEX IF EXISTS {self.name}")
+        elif vendor == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {self.name}_{suffix}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {self.name}")
+
+    def search(self, queryset, text):
+        """
+        Filter `queryset` down to rows matching every word of `text` (the
+        last one as a prefix, so results show up while typing) and order them
+        by relevance, best first. The score is set as `search_rank`.
+
+        Other databases have no index: every word is looked up with icontains
+        and all matches rank the same.
+        """
+        words = re.findall(r"\w+", text.lower())
+        if not words:
+            return queryset.none()
+        vendor = connection.vendor
+        if vendor == "postgresql":
+            terms = words[:-1] + [f"{words[-1]}:*"]
+            # The very expression of the GIN index, which SearchVector would
+            # not compile to.
+            document = RawSQL(self.document, [], output_field=SearchVectorField())
+            query = SearchQuery(" & ".join(terms), config="simple", search_type="raw")
+            queryset = (
+                queryset.alias(search_document=document)
+                .filter(search_document=query)
+                .annotate(search_rank=SearchRank(document, query))
+            )
+        elif vendor == "sqlite":
+            terms = [f'"{word}"' for word in words]
+            terms[-1] += "*"
+            match = " ".join(terms)
+            queryset = queryset.filter(
+                pk__in=RawSQL(
+                    f"SELECT rowid FROM {self.name} WHERE {self.name} MATCH %s",
+                    [match],
+                )
+            ).annotate(
+                # bm25() is lower for better matches.
+                search_rank=RawSQL(
+                    f"SELECT -bm25({self.name}) FROM {self.name} "
+                    f"WHERE {self.name} MATCH %s AND rowid = {self.table}.id",
+                    [match],
+                    output_field=FloatField(),
+                )
+            )
+        else:
+            for word in words:
+                matches = Q()
+                for field in self.fields:
+                    matches |= Q(**{f"{field}__icontains": word})
+                queryset = queryset.filter(matches)
+            queryset = queryset.annotate(search_rank=Value(0.0))
+        return queryset.order_by("-search_rank", "-pk")
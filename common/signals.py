@@ -0,0 +1,39 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from .cache import bump_generation
+
+# Models whose writes invalidate cached responses. Only these get receivers:
+# a post_delete receiver turns off fast deletes for its model.
+TRACKED_MODELS = [
+    "rooms.Room",
+    "rooms.Amenity",
+    "medias.Photo",
+    "categories.Category",
+    "reviews.Review",
+    "users.User",
+    "wishlists.Wishlist",
+    "experiences.Experience",
+    "experiences.Perk",
+]
+
+
+def bump_generation_on_write(sender, **kwargs):
+    # This also covers M2M changes saved along with their object (views,
+    # admin); direct writes to through tables bump the generation themselves.
+    bump_generation(sender)
+
+
+def connect_signals():
+    for label in TRACKED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(
+            bump_generation_on_write,
+            sender=model,
+            dispatch_uid=f"common_bump_generation_on_save_{label}",
+        )
+        post_delete.connect(
+            bump_generation_on_write,
+            sender=model,
+            dispatch_uid=f"common_bump_generation_on_delete_{label}",
+        )
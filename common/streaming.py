@@ -0,0 +1,185 @@
+import csv
+import io
+import itertools
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def csv_value(value):
+    if isinstance(value, dict):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    if isinstance(value, list):
+        if any(isinstance(item, (dict, list)) for item in value):
+            return json.dumps(value, cls=DjangoJSONEncoder)
+        return "|".join(map(str, value))
+    return value
+
+
+def csv_lines(rows, fields):
+    """
+    CSV text of dict rows, a line at a time. Lists of plain values are
+    joined with "|", the separator read_csv() splits on, nested objects are
+    written as JSON.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({key: csv_value(value) for key, value in row.items()})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Only the header was written when there were no rows.
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def read_ndjson(lines):
+    """Yield (line number, record) pairs, or (line number, None) on bad JSON."""
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield number, record if isinstance(record, dict) else None
+
+
+def read_csv(lines, list_fields=()):
+    """
+    Yield (row number, record) pairs from CSV with a header row. Empty cells
+    are left out and `list_fields` are split on "|".
+    """
+    lines = (line.decode("utf-8") if isinstance(line, bytes) else line for line in lines)
+    for number, row in enumerate(csv.DictReader(lines), start=2):
+        record = {key: value for key, value in row.items() if key and value != ""}
+        for field in list_fields:
+            if field in record:
+                record[field] = record[field].split("|")
+        yield number, record
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return "".join(ndjson_lines(rows)).encode()
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        fields = list(dict.fromkeys(key for row in rows for key in row))
+        return "".join(csv_lines(rows, fields)).encode()
+
+
+async def iterate_in_thread(iterator, chunk_size=None):
+    """
+    Async iteration over a sync iterator, advanced `chunk_size` items at a
+    time in the request's sync thread, where its database connection is.
+    """
+    chunk_size = chunk_size or settings.STREAMING_CHUNK_SIZE
+    iterator = iter(iterator)
+    next_chunk = sync_to_async(lambda: list(itertools.islice(iterator, chunk_size)))
+    try:
+        while chunk := await next_chunk():
+            for item in chunk:
+                yield item
+    finally:
+        if hasattr(iterator, "close"):
+            await sync_to_async(iterator.close)()
+
+
+def streaming_response(rows, format, fields=None, filename=None, request=None):
+    """
+    A StreamingHttpResponse writing `rows` (an iterable of dicts) as NDJSON
+    or CSV as they are produced.
+
+    Pass the `request`: under ASGI the content is then an async iterator,
+    Django would otherwise read a sync one to the end before sending the
+    first byte.
+    """
+    if format == CSVRenderer.format:
+        lines = csv_lines(rows, fields)
+        content_type = "text/csv; charset=utf-8"
+        extension = "csv"
+    else:
+        lines = ndjson_lines(rows)
+        content_type = "application/x-ndjson"
+        extension = "ndjson"
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        lines = iterate_in_thread(lines)
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    if filename:
+        response["Content-Disposition"] = (
+            f'attachment; filename="{filename}.{extension}"'
+        )
+    return response
+
+
+def serialize_rows(queryset, serializer_class, context=None, chunk_size=None):
+    """
+    Serialize the queryset a chunk at a time, reading it with iterator() so
+    neither the rows nor their serialized form are all in memory at once.
+    """
+    chunk_size = chunk_size or settings.STREAMING_CHUNK_SIZE
+    context = {} if context is None else context
+    chunk = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) == chunk_size:
+            yield from serializer_class(chunk, many=True, context=context).data
+            chunk = []
+    if chunk:
+        yield from serializer_class(chunk, many=True, context=context).data
+
+
+class StreamingListMixin:
+    """
+    Lets a list view answer ?format=ndjson or ?format=csv with a streamed
+    response, see stream_list().
+    """
+
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        NDJSONRenderer,
+        CSVRenderer,
+    ]
+
+    def stream_list(self, request, queryset, serializer_class, context=None):
+        """
+        The streaming response for the requested format, or None when the
+        client asked for a regular one.
+        """
+        format = request.accepted_renderer.format
+        if format not in (NDJSONRenderer.format, CSVRenderer.format):
+            return None
+        fields = list(serializer_class(context=context).fields)
+        rows = serialize_rows(queryset, serializer_class, context)
+        return streaming_response(rows, format, fields, request=request)
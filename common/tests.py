@@ -1,3 +1,117 @@
+import json
+import time
+import warnings
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from experiences.models import Perk
+from users.models import User
+from .cache import (
+    CacheNamespace,
+    bump_object_generations,
+    get_generations,
+    make_key,
+)
+from .streaming import iterate_in_thread
+
+
+class TestCacheNamespace(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.namespace = CacheNamespace("tests")
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_make_key(self):
+        self.assertEqual(make_key("rooms", "payload", 1), "rooms:payload:1")
+        key = make_key("search", "two words")
+        self.assertTrue(key.startswith("search:"))
+        self.assertNotIn(" ", key)
+        self.assertLess(len(make_key("search", "x" * 500)), 250)
+
+    def test_get_or_set(self):
+        self.assertEqual(self.namespace.get_or_set(("a", 1), self.compute, 60), 1)
+        self.assertEqual(self.namespace.get_or_set(("a", 1), self.compute, 60), 1)
+        self.assertEqual(self.namespace.get_or_set(("a", 2), self.compute, 60), 2)
+        self.namespace.delete(("a", 1))
+        self.assertEqual(self.namespace.get_or_set(("a", 1), self.compute, 60), 3)
+        # A TTL of 0 disables the cache.
+        self.assertEqual(self.namespace.get_or_set("b", self.compute, 0), 4)
+        self.assertEqual(self.namespace.get_or_set("b", self.compute, 0), 5)
+
+    def test_early_expiration(self):
+        key = self.namespace.make_key("slow")
+        # Took 10s to compute and expires in 1s: refreshed ahead of time.
+        cache.set(key, ("old", 10, time.time() + 1), 60)
+        with mock.patch("common.cache.random.random", return_value=0.5):
+            self.assertEqual(self.namespace.get_or_set("slow", self.compute, 60), 1)
+        # Fresh entries are served.
+        with mock.patch("common.cache.random.random", return_value=0.5):
+            self.assertEqual(self.namespace.get_or_set("slow", self.compute, 60), 1)
+
+
+class TestGenerations(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_object_generations(self):
+        before = get_generations([Perk, (Perk, 1), (Perk, 2)])
+        self.assertEqual(get_generations([Perk, (Perk, 1), (Perk, 2)]), before)
+        bump_object_generations(Perk, 1)
+        after = get_generations([Perk, (Perk, 1), (Perk, 2)])
+        self.assertEqual(after[0], before[0])
+        self.assertNotEqual(after[1], before[1])
+        self.assertEqual(after[2], before[2])
+
+
+class TestDatabasePools(APITestCase):
+    def test_admin_only(self):
+        url = "/api/v1/database/pools/"
+        user = User.objects.create(username="admin")
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        user.is_staff = True
+        user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        pools = response.json()["pools"]
+        if getattr(connection, "pool", None):
+            self.assertEqual(pools["default"]["pool_max"], connection.pool.max_size)
+        else:
+            # SQLite isn't pooled.
+            self.assertEqual(pools, {})
+
+
+class TestStreaming(TestCase):
+    async def test_iterate_in_thread(self):
+        produced = []
+
+        def rows():
+            for i in range(10):
+                produced.append(i)
+                yield i
+
+        iterator = iterate_in_thread(rows(), chunk_size=3)
+        self.assertEqual(await anext(iterator), 0)
+        # Only the first chunk was read.
+        self.assertEqual(produced, [0, 1, 2])
+        self.assertEqual([row async for row in iterator], list(range(1, 10)))
 
-# Create your tests here.
+    async def test_asgi_streaming(self):
+        await Perk.objects.acreate(name="Lunch", details="", explanation="")
+        response = await self.async_client.get(
+            "/api/v1/experiences/perks/", {"format": "ndjson"}
+        )
+        self.assertTrue(response.is_async)
+        with warnings.catch_warnings():
+            # Django warns when it has to buffer a sync iterator.
+            warnings.simplefilter("error")
+            lines = [line async for line in response.streaming_content]
+        self.assertEqual(json.loads(b"".join(lines))["name"], "Lunch")
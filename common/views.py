@@ -1,3 +1,22 @@
-from django.shortcuts import render
+import os
+
+from django.db import connections
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 # Create your views here.
+
+
+class DatabasePools(APIView):
+    """Connection pool statistics of the worker process answering."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        pools = {}
+        for connection in connections.all():
+            # Only PostgreSQL connections configured with OPTIONS["pool"].
+            if getattr(connection, "pool", None):
+                pools[connection.alias] = connection.pool.get_stats()
+        return Response({"pid": os.getpid(), "pools": pools})
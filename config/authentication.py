@@ -1,9 +1,10 @@
-import jwt
-from django.conf import settings
 from rest_framework.authentication import BaseAuthentication
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework import exceptions
 
 from users.models import User
+from users.cache import get_user_by_pk, get_user_by_username
+from users.tokens import ACCESS, decode_token
 
 
 class TrustMeBroAuthentication(BaseAuthentication):
@@ -13,28 +14,50 @@ class TrustMeBroAuthentication(BaseAuthentication):
         if not username:
             return None
         try:
-            user = User.objects.get(username=username)
+            if request.method in SAFE_METHODS:
+                user = get_user_by_username(username)
+            else:
+                # Views may save request.user, never hand them a cached copy.
+                user = User.objects.get(username=username)
             return (user, None)
         except User.DoesNotExist:
             raise exceptions.AuthenticationFailed(f"No user {username}")
 
 
 class JwtAuthentication(BaseAuthentication):
+    """
+    Views setting `token_claims_auth = True` get, on safe methods, a user
+    built from the token claims alone (pk, username, is_host) without
+    loading the row. Other safe methods take the user from the cache,
+    unsafe ones from the database, and check that the token version hasn't
+    been revoked.
+    """
 
     def authenticate(self, request):
         token = request.headers.get("Token")
         if not token:
             return None
-        decoded = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=["HS256"],
-        )
-        pk = decoded.get("pk")
-        if not pk:
-            raise exceptions.AuthenticationFailed("Invalid Token")
+        decoded = decode_token(token, ACCESS)
+        view = request.parser_context.get("view")
+        if request.method in SAFE_METHODS and getattr(view, "token_claims_auth", False):
+            return (self.get_claims_user(decoded), decoded)
         try:
-            user = User.objects.get(pk=pk)
-            return (user, None)
+            if request.method in SAFE_METHODS:
+                user = get_user_by_pk(decoded["pk"])
+            else:
+                user = User.objects.get(pk=decoded["pk"])
         except User.DoesNotExist:
             raise exceptions.AuthenticationFailed("User not found")
+        if not user.is_active or user.token_version != decoded["ver"]:
+            raise exceptions.AuthenticationFailed("Token revoked")
+        return (user, decoded)
+
+    def get_claims_user(self, decoded):
+        user = User(
+            pk=decoded["pk"],
+            username=decoded.get("username", ""),
+            is_host=decoded.get("is_host", False),
+            token_version=decoded["ver"],
+        )
+        user._state.adding = False
+        return user
@@ -0,0 +1,204 @@
+import hashlib
+import logging
+
+from django.conf import settings
+from graphql import (
+    ExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    get_named_type,
+    get_nullable_type,
+    is_leaf_type,
+    is_list_type,
+)
+from graphql.execution.values import get_argument_values
+from graphql.utilities import get_operation_ast
+from strawberry.extensions import SchemaExtension
+
+from common.cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+_documents = LocalCache(max_size=settings.GRAPHQL_DOCUMENT_CACHE_SIZE, ttl=None)
+
+
+class DocumentCache(SchemaExtension):
+    """
+    Keeps parsed documents in a process-wide LRU keyed by the sha256 of the
+    query text, and remembers which of them passed validation so both steps
+    run once per distinct operation.
+    """
+
+    def on_parse(self):
+        execution_context = self.execution_context
+        self.key = hashlib.sha256(execution_context.query.encode()).hexdigest()
+        self.entry = _documents.get(self.key)
+        if self.entry is not None:
+            execution_context.graphql_document = self.entry["document"]
+        yield
+        if self.entry is None and execution_context.graphql_document is not None:
+            self.entry = {"document": execution_context.graphql_document, "valid": False}
+            _documents.set(self.key, self.entry)
+
+    def on_validate(self):
+        execution_context = self.execution_context
+        if self.entry is not None and self.entry["valid"]:
+            # Marks validation as done, see strawberry's _run_validation().
+            execution_context.errors = []
+        yield
+        if self.entry is not None and not execution_context.errors:
+            self.entry["valid"] = True
+
+
+class QueryCostLimiter(SchemaExtension):
+    """
+    Scores an operation before it runs and rejects it when the score is
+    over settings.GRAPHQL_MAX_QUERY_COST.
+
+    Every object field costs 1 (leaves cost nothing) unless `field_costs`
+    says otherwise, and the selections below a list field are multiplied by
+    its expected length: the `first` argument when given, then
+    `list_sizes`, then settings.GRAPHQL_DEFAULT_LIST_SIZE. Connection fields
+    take `first` themselves, so their size is handed down to the list below
+    them (`edges`). The score is reported under the "cost" key of the
+    response extensions.
+    """
+
+    field_costs = {}
+
+    list_sizes = {
+        "RoomType.reviews": settings.PAGE_SIZE,
+        "Query.allRooms": settings.CURSOR_PAGE_SIZE,
+        "Query.searchRooms": settings.CURSOR_PAGE_SIZE,
+    }
+
+    cost = None
+
+    def on_execute(self):
+        execution_context = self.execution_context
+        self.cost = self.get_operation_cost()
+        maximum = settings.GRAPHQL_MAX_QUERY_COST
+        logger.info(
+            "GraphQL operation %s cost %s",
+            execution_context.operation_name or "<anonymous>",
+            self.cost,
+        )
+        if self.cost is not None and self.cost > maximum:
+            execution_context.result = ExecutionResult(
+                data=None,
+                errors=[
+                    GraphQLError(
+                        f"Query cost {self.cost} exceeds the maximum of {maximum}."
+                    )
+                ],
+            )
+        yield
+
+    def get_results(self):
+        if self.cost is None:
+            return {}
+        return {
+            "cost": {
+                "requested": self.cost,
+                "maximum": settings.GRAPHQL_MAX_QUERY_COST,
+            }
+        }
+
+    def get_operation_cost(self):
+        execution_context = self.execution_context
+        document = execution_context.graphql_document
+        operation = get_operation_ast(document, execution_context.operation_name)
+        if operation is None:
+            return None
+        schema = execution_context.schema._schema
+        root_type = schema.get_root_type(operation.operation)
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        self.variables = execution_context.variables or {}
+        return self.get_selection_cost(root_type, operation.selection_set, set())
+
+    def get_selection_cost(
+        self, parent_type, selection_set, visited_fragments, page_size=None
+    ):
+        schema = self.execution_context.schema._schema
+        cost = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                cost += self.get_field_cost(
+                    parent_type, selection, visited_fragments, page_size
+                )
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = (
+                    schema.get_type(selection.type_condition.name.value)
+                    if selection.type_condition
+                    else parent_type
+                )
+                cost += self.get_selection_cost(
+                    fragment_type,
+                    selection.selection_set,
+                    visited_fragments,
+                    page_size,
+                )
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in visited_fragments:
+                    continue
+                cost += self.get_selection_cost(
+                    schema.get_type(fragment.type_condition.name.value),
+                    fragment.selection_set,
+                    visited_fragments | {name},
+                    page_size,
+                )
+        return cost
+
+    def get_field_cost(self, parent_type, node, visited_fragments, page_size=None):
+        name = node.name.value
+        field = getattr(parent_type, "fields", {}).get(name)
+        if field is None:
+            return 0
+        named_type = get_named_type(field.type)
+        key = f"{parent_type.name}.{name}"
+        cost = self.field_costs.get(key, 0 if is_leaf_type(named_type) else 1)
+        if node.selection_set:
+            if is_list_type(get_nullable_type(field.type)):
+                size = self.get_list_size(key, field, node, page_size)
+                children = size * self.get_selection_cost(
+                    named_type, node.selection_set, visited_fragments
+                )
+            else:
+                children = self.get_selection_cost(
+                    named_type,
+                    node.selection_set,
+                    visited_fragments,
+                    self.get_page_size(key, field, node),
+                )
+            cost += children
+        return cost
+
+    def get_list_size(self, key, field, node, page_size=None):
+        first = self.get_first(field, node)
+        if first is not None:
+            return max(first, 0)
+        if page_size is not None:
+            return page_size
+        return self.list_sizes.get(key, settings.GRAPHQL_DEFAULT_LIST_SIZE)
+
+    def get_page_size(self, key, field, node):
+        if "first" not in field.args:
+            return None
+        return self.get_list_size(key, field, node)
+
+    def get_first(self, field, node):
+        if "first" not in field.args:
+            return None
+        try:
+            return get_argument_values(field, node, self.variables).get("first")
+        except GraphQLError:
+            return None
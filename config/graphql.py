@@ -0,0 +1,117 @@
+import hashlib
+from dataclasses import dataclass
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from graphql import GraphQLError
+from strawberry.dataloader import DataLoader
+from strawberry.django.context import StrawberryDjangoContext
+from strawberry.django.views import AsyncGraphQLView
+from strawberry.http import GraphQLRequestData
+from strawberry.http.exceptions import HTTPException
+from strawberry.types import ExecutionResult
+
+from users.dataloaders import load_users
+from reviews.dataloaders import load_room_reviews
+from wishlists.dataloaders import load_liked_rooms
+
+
+class Loaders:
+    """Per-request DataLoaders, batching the lookups of sibling resolvers."""
+
+    def __init__(self, user):
+        self.users = DataLoader(load_fn=load_users)
+        self.room_reviews = DataLoader(load_fn=load_room_reviews)
+        self.liked_rooms = DataLoader(load_fn=partial(load_liked_rooms, user))
+
+
+@dataclass
+class Context(StrawberryDjangoContext):
+    loaders: Loaders
+
+
+class PersistedQueryError(GraphQLError):
+    pass
+
+
+def persisted_query_key(sha256_hash):
+    return f"graphql:persisted-query:{sha256_hash}"
+
+
+class GraphQLView(AsyncGraphQLView):
+    """
+    Adds automatic persisted queries: a request may send
+    `extensions.persistedQuery.sha256Hash` instead of the query text, once
+    the query has been registered by a request carrying both.
+    """
+
+    async def get_context(self, request, response):
+        # Resolve the lazy user up front, resolvers run in the event loop.
+        request.user = await request.auser()
+        return Context(
+            request=request,
+            response=response,
+            loaders=Loaders(request.user),
+        )
+
+    def should_render_graphql_ide(self, request):
+        return (
+            super().should_render_graphql_ide(request)
+            and "extensions" not in request.query_params
+        )
+
+    async def execute_operation(self, request, context, root_value):
+        try:
+            return await super().execute_operation(request, context, root_value)
+        except PersistedQueryError as error:
+            return ExecutionResult(data=None, errors=[error])
+
+    async def parse_http_body(self, request):
+        content_type = request.content_type or ""
+        if "application/json" in content_type:
+            data = self.parse_json(await request.get_body())
+        elif content_type.startswith("multipart/form-data"):
+            data = await self.parse_multipart(request)
+        elif request.method == "GET":
+            data = self.parse_query_params(request.query_params)
+        else:
+            raise HTTPException(400, "Unsupported content type")
+
+        query = data.get("query")
+        extensions = data.get("extensions") or {}
+        if isinstance(extensions, str):
+            extensions = self.parse_json(extensions)
+        persisted_query = extensions.get("persistedQuery")
+        if persisted_query:
+            query = await self.get_persisted_query(query, persisted_query)
+
+        return GraphQLRequestData(
+            query=query,
+            variables=data.get("variables"),
+            operation_name=data.get("operationName"),
+        )
+
+    async def get_persisted_query(self, query, persisted_query):
+        sha256_hash = persisted_query.get("sha256Hash")
+        if persisted_query.get("version") != 1 or not sha256_hash:
+            raise PersistedQueryError(
+                "Unsupported persisted query version",
+                extensions={"code": "PERSISTED_QUERY_NOT_SUPPORTED"},
+            )
+        key = persisted_query_key(sha256_hash)
+        if query is None:
+            query = await cache.aget(key)
+            if query is None:
+                raise PersistedQueryError(
+                    "PersistedQueryNotFound",
+                    extensions={"code": "PERSISTED_QUERY_NOT_FOUND"},
+                )
+            return query
+        if hashlib.sha256(query.encode()).hexdigest() != sha256_hash:
+            raise PersistedQueryError(
+                "provided sha does not match query",
+                extensions={"code": "BAD_REQUEST"},
+            )
+        await cache.aset(key, query, settings.GRAPHQL_PERSISTED_QUERY_TIMEOUT)
+        return query
@@ -1,5 +1,9 @@
 import strawberry
+from django.conf import settings
+from strawberry.extensions import QueryDepthLimiter
+
 from rooms import schema as rooms_schema
+from .extensions import DocumentCache, QueryCostLimiter
 
 
 @strawberry.type
@@ -16,4 +20,9 @@ class Mutation:
 schema = strawberry.Schema(
     query=Query,
     #    mutation=Mutation,
+    extensions=[
+        DocumentCache,
+        QueryDepthLimiter(max_depth=settings.GRAPHQL_MAX_QUERY_DEPTH),
+        QueryCostLimiter,
+    ],
 )
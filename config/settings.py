@@ -11,7 +11,9 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from pathlib import Path
+from datetime import timedelta
 import os
+import tempfile
 import environ
 import dj_database_url
 import sentry_sdk
@@ -115,14 +117,77 @@ if DEBUG:
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            # A file (not the shared-cache in-memory default) so concurrency
+            # tests see the same locking behaviour as the dev database.
+            "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
         }
     }
 else:
+    # Under ASGI every request runs its database code in a new thread, so
+    # persistent connections (CONN_MAX_AGE) pile up instead of being reused.
+    # Each worker process shares Django's psycopg pool of
+    # DATABASE_POOL_MIN_SIZE to DATABASE_POOL_MAX_SIZE connections between
+    # its threads instead: keep WEB_CONCURRENCY * DATABASE_POOL_MAX_SIZE
+    # under max_connections. DATABASE_POOL=false goes back to persistent
+    # connections.
     DATABASES = {
         "default": dj_database_url.config(
             conn_max_age=600,
+            conn_health_checks=True,
         )
     }
+    DATABASE_POOL = env.bool("DATABASE_POOL", default=True) and (
+        DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql"
+    )
+    if DATABASE_POOL:
+        # The pool doesn't support persistent connections.
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+            "min_size": env.int("DATABASE_POOL_MIN_SIZE", default=1),
+            "max_size": env.int("DATABASE_POOL_MAX_SIZE", default=4),
+            "timeout": env.float("DATABASE_POOL_TIMEOUT", default=10),
+            "max_idle": env.float("DATABASE_POOL_MAX_IDLE", default=600),
+        }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# CACHE_URL selects a cache shared by every worker and instance, e.g.
+# redis://host:6379/0 (needs redis) or pymemcache://host:11211 (needs
+# pymemcache). Without it the workers of an instance share a file cache,
+# and the single development server keeps a local memory one.
+
+CACHE_URL = env("CACHE_URL", default=None)
+
+if CACHE_URL:
+    CACHES = {
+        "default": env.cache_url_config(
+            CACHE_URL,
+            # django-environ still maps these to removed backends.
+            backend=(
+                "django.core.cache.backends.memcached.PyMemcacheCache"
+                if CACHE_URL.startswith(("memcache://", "pymemcache://"))
+                else None
+            ),
+        )
+    }
+elif DEBUG:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": env(
+                "CACHE_DIR",
+                default=os.path.join(tempfile.gettempdir(), "airbnbclone-cache"),
+            ),
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
 
 
 # Password validation
@@ -181,6 +246,61 @@ MEDIA_URL = "user-uploads/"
 # Local Values
 PAGE_SIZE = 3
 
+CURSOR_PAGE_SIZE = 20
+
+MAX_PAGE_SIZE = 100
+
+AVAILABILITY_CACHE_TTL = 60
+
+CALENDAR_MAX_ROOMS = 100
+
+CALENDAR_MAX_DAYS = 366
+
+BOOKING_MAX_RETRIES = 5
+
+USER_CACHE_TTL = 30
+
+USER_CACHE_SIZE = 1024
+
+# CACHES alias through which the workers share cached users. Their
+# invalidations go through the generations in the default cache.
+USER_CACHE_ALIAS = "default"
+
+JWT_ACCESS_TOKEN_LIFETIME = timedelta(minutes=15)
+
+JWT_REFRESH_TOKEN_LIFETIME = timedelta(days=14)
+
+LIKED_ROOMS_CACHE_TTL = 30
+
+LIKED_ROOMS_CACHE_SIZE = 1024
+
+MAP_MAX_ROOMS = 500
+
+BULK_IMPORT_CHUNK_SIZE = 500
+
+STREAMING_CHUNK_SIZE = 500
+
+RESPONSE_CACHE_TTL = 60
+
+# Room payloads are versioned, the TTL only bounds how long unread ones stay.
+ROOM_PAYLOAD_CACHE_TTL = 60 * 60
+
+# Upper bounds of the price facet buckets, the last bucket is open.
+PRICE_BUCKETS = [50, 100, 200, 500]
+
+FACETS_CACHE_TTL = 60
+
+# GraphQL
+GRAPHQL_MAX_QUERY_DEPTH = 8
+
+GRAPHQL_MAX_QUERY_COST = 5000
+
+GRAPHQL_DEFAULT_LIST_SIZE = 100
+
+GRAPHQL_DOCUMENT_CACHE_SIZE = 512
+
+GRAPHQL_PERSISTED_QUERY_TIMEOUT = 60 * 60 * 24 * 7
+
 
 # DRF
 REST_FRAMEWORK = {
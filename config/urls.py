@@ -20,7 +20,8 @@ from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
 
-from strawberry.django.views import GraphQLView
+from common.views import DatabasePools
+from .graphql import GraphQLView
 from .schema import schema
 
 urlpatterns = [
@@ -31,5 +32,6 @@ urlpatterns = [
     path("api/v1/medias/", include("medias.urls")),
     path("api/v1/wishlists/", include("wishlists.urls")),
     path("api/v1/users/", include("users.urls")),
+    path("api/v1/database/pools/", DatabasePools.as_view()),
     path("graphql", GraphQLView.as_view(schema=schema)),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
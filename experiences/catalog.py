@@ -0,0 +1,5 @@
+from common.catalog import Catalog
+
+from .models import Perk
+
+perk_catalog = Catalog(Perk)
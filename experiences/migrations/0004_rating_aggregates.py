@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0003_alter_experience_category_alter_experience_host_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='experience',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='experience',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from common.search import SearchIndex
+
+index = SearchIndex("experiences_experience", ["name", "description"])
+
+
+def install_search_index(apps, schema_editor):
+    index.install(schema_editor)
+
+
+def uninstall_search_index(apps, schema_editor):
+    index.uninstall(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0004_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
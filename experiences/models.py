@@ -35,6 +35,19 @@ class Experience(CommonModel):
         blank=True,
         related_name="experiences",
     )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+
+    def rating(self):
+        if self.review_count == 0:
+            return 0
+        return round(self.rating_sum / self.review_count, 2)
 
     def __str__(self) -> str:
         return self.name
@@ -0,0 +1,3 @@
+from common.search import SearchIndex
+
+experience_index = SearchIndex("experiences_experience", ["name", "description"])
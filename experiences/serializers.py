@@ -1,5 +1,5 @@
 # DRF Imports
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import ModelSerializer, SerializerMethodField
 from rest_framework import exceptions
 
 # Model Imports
@@ -31,19 +31,31 @@ class ExperienceListSerializer(ModelSerializer):
             "address",
             "start",
             "end",
+            "rating",
         )
 
+    rating = SerializerMethodField()
+
+    def get_rating(self, experience):
+        return experience.rating()
+
 
 class ExperienceDetailSerializer(ModelSerializer):
 
     class Meta:
         model = Experience
-        fields = "__all__"
+        # The aggregates behind rating.
+        exclude = ("rating_sum", "review_count")
 
     host = TinyUserSerializer(read_only=True)
     perks = PerkSerializer(read_only=True, many=True)
     category = CategorySerializer(read_only=True)
 
+    rating = SerializerMethodField()
+
+    def get_rating(self, experience):
+        return experience.rating()
+
     def validate(self, data):
         if data["start"] > data["end"]:
             raise exceptions.ValidationError(
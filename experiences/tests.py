@@ -1,3 +1,17 @@
-from django.test import TestCase
+import csv
+from io import StringIO
 
-# Create your tests here.
+from rest_framework.test import APITestCase
+
+from .models import Perk
+
+
+class TestPerks(APITestCase):
+    def test_streaming_csv(self):
+        Perk.objects.create(name="Lunch", details="Details", explanation="Explanation")
+        response = self.client.get("/api/v1/experiences/perks/", {"format": "csv"})
+        self.assertTrue(response.streaming)
+        rows = list(
+            csv.DictReader(StringIO(b"".join(response.streaming_content).decode()))
+        )
+        self.assertEqual([row["name"] for row in rows], ["Lunch"])
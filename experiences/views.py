@@ -1,4 +1,5 @@
 # Django Imports
+from django.conf import settings
 from django.db import transaction
 
 # DRF Imports
@@ -16,13 +17,28 @@ from experiences.models import Perk
 # Serializer Imports
 from . import serializers
 
+# Common Imports
+from common.paginations import get_page_size, get_page_number
+from common.conditional import conditional_response, get_rows_version
+from common.streaming import StreamingListMixin
+from .search import experience_index
+from .catalog import perk_catalog
+from categories.catalog import category_catalog
 
-class Experiences(APIView):
+
+class Experiences(StreamingListMixin, APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get(self, request):
         experiences = Experience.objects.all()
+        response = self.stream_list(
+            request,
+            experiences.order_by("pk"),
+            serializers.ExperienceListSerializer,
+        )
+        if response is not None:
+            return response
         serializer = serializers.ExperienceListSerializer(experiences, many=True)
         return Response(serializer.data)
 
@@ -33,7 +49,7 @@ class Experiences(APIView):
             if not category_id:
                 raise exceptions.ParseError("Category is required.")
             try:
-                category = Category.objects.get(pk=category_id)
+                category = category_catalog.get(category_id)
                 if category.kind == Category.CategoryKindChoices.ROOMS:
                     raise exceptions.ParseError(
                         "The category kind should be 'experiences'."
@@ -41,30 +57,63 @@ class Experiences(APIView):
             except Category.DoesNotExist:
                 raise exceptions.NotFound("Category not found.")
 
+            perks = request.data.get("perks")
             try:
-                with transaction.atomic():
-                    experience = serializer.save(host=request.user, category=category)
-                    perks = request.data.get("perks")
-                    for perk_id in perks:
-                        perk = Perk.objects.get(pk=perk_id)
-                        experience.perks.add(perk)
-                    return Response(
-                        serializers.ExperienceDetailSerializer(experience).data
-                    )
-            except:
+                perks = {int(perk_id) for perk_id in perks}
+            except (TypeError, ValueError):
+                raise exceptions.ParseError("Perk not found.")
+            if len(perk_catalog.in_bulk(perks)) != len(perks):
                 raise exceptions.ParseError("Perk not found.")
+            with transaction.atomic():
+                experience = serializer.save(host=request.user, category=category)
+                experience.perks.add(*perks)
+            return Response(serializers.ExperienceDetailSerializer(experience).data)
 
         else:
             return Response(serializer.errors)
 
 
-class Perks(APIView):
+class ExperiencesSearch(APIView):
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get(self, request):
-        all_perks = Perk.objects.all()
-        serializer = serializers.PerkSerializer(all_perks, many=True)
+        query = request.query_params.get("q", "")
+        if not query.strip():
+            raise exceptions.ParseError("The 'q' parameter is required.")
+        page_size = get_page_size(
+            request,
+            settings.CURSOR_PAGE_SIZE,
+            settings.MAX_PAGE_SIZE,
+        )
+        start = (get_page_number(request) - 1) * page_size
+        experiences = experience_index.search(Experience.objects.all(), query)
+        serializer = serializers.ExperienceListSerializer(
+            experiences[start : start + page_size],
+            many=True,
+        )
         return Response(serializer.data)
 
+
+class Perks(StreamingListMixin, APIView):
+
+    def get(self, request):
+        response = self.stream_list(
+            request,
+            Perk.objects.all(),
+            serializers.PerkSerializer,
+        )
+        if response is not None:
+            return response
+        all_perks = perk_catalog.all()
+        return conditional_response(
+            request,
+            ("perks",),
+            [Perk],
+            lambda: get_rows_version(all_perks),
+            lambda: serializers.PerkSerializer(all_perks, many=True).data,
+        )
+
     def post(self, request):
         serializer = serializers.PerkSerializer(data=request.data)
         if serializer.is_valid():
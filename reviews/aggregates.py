@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def apply_rating_delta(model, pk, count_delta, sum_delta):
+    if pk is None:
+        return
+    model.objects.filter(pk=pk).update(
+        review_count=F("review_count") + count_delta,
+        rating_sum=F("rating_sum") + sum_delta,
+    )
+
+
+def rebuild_rating_aggregates(review_model, model, field, pks=None):
+    """
+    Recompute review_count / rating_sum of the rows of `model` (all of them
+    unless `pks` is given) in a single UPDATE, from the reviews pointing at
+    it through `field`.
+    """
+    reviews = (
+        review_model.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+    )
+    rows = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+    with transaction.atomic():
+        return rows.update(
+            review_count=Coalesce(
+                Subquery(reviews.annotate(count=Count("pk")).values("count")),
+                0,
+            ),
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum("rating")).values("total")),
+                0,
+            ),
+        )
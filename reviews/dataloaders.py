@@ -0,0 +1,39 @@
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Review
+
+
+@sync_to_async
+def _get_room_reviews(room_ids, page):
+    """One page of reviews for every room, in a single windowed query."""
+    start = (page - 1) * settings.PAGE_SIZE
+    end = start + settings.PAGE_SIZE
+    reviews = (
+        Review.objects.filter(room_id__in=room_ids)
+        .annotate(
+            row=Window(RowNumber(), partition_by=F("room_id"), order_by=F("pk").asc())
+        )
+        .filter(row__gt=start, row__lte=end)
+        .order_by("room_id", "pk")
+    )
+    by_room = defaultdict(list)
+    for review in reviews:
+        by_room[review.room_id].append(review)
+    return by_room
+
+
+async def load_room_reviews(keys):
+    """Keys are (room_id, page) pairs."""
+    room_ids_by_page = defaultdict(list)
+    for room_id, page in keys:
+        room_ids_by_page[page].append(room_id)
+    pages = {
+        page: await _get_room_reviews(room_ids, page)
+        for page, room_ids in room_ids_by_page.items()
+    }
+    return [pages[page].get(room_id, []) for room_id, page in keys]
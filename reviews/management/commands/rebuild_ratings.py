@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from rooms.models import Room
+from experiences.models import Experience
+from reviews.models import Review
+from reviews.aggregates import rebuild_rating_aggregates
+
+
+class Command(BaseCommand):
+
+    help = "Rebuild the stored review aggregates of rooms and experiences"
+
+    def handle(self, *args, **options):
+        rooms = rebuild_rating_aggregates(Review, Room, "room")
+        experiences = rebuild_rating_aggregates(Review, Experience, "experience")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt ratings of {rooms} rooms and {experiences} experiences."
+            )
+        )
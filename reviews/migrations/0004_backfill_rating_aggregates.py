@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:22
+
+from django.db import migrations
+
+from reviews.aggregates import rebuild_rating_aggregates
+
+
+def backfill(apps, schema_editor):
+    Review = apps.get_model("reviews", "Review")
+    rebuild_rating_aggregates(Review, apps.get_model("rooms", "Room"), "room")
+    rebuild_rating_aggregates(
+        Review, apps.get_model("experiences", "Experience"), "experience"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0004_rating_aggregates'),
+        ('reviews', '0003_alter_review_experience_alter_review_room_and_more'),
+        ('rooms', '0008_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from rooms.models import Room
+from experiences.models import Experience
+
+from .aggregates import apply_rating_delta, rebuild_rating_aggregates
+from .models import Review
+
+
+def _snapshot(review):
+    values = review.__dict__
+    if not all(key in values for key in ("room_id", "experience_id", "rating")):
+        # Deferred fields, don't trigger a query just to remember them.
+        return None
+    return (values["room_id"], values["experience_id"], values["rating"])
+
+
+@receiver(post_init, sender=Review)
+def remember_rating(sender, instance, **kwargs):
+    instance._rating_snapshot = _snapshot(instance)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    old = instance._rating_snapshot
+    with transaction.atomic():
+        if not created and old is None:
+            # Previous values are unknown, recount the current targets instead.
+            rebuild_rating_aggregates(Review, Room, "room", [instance.room_id])
+            rebuild_rating_aggregates(
+                Review, Experience, "experience", [instance.experience_id]
+            )
+        else:
+            if not created:
+                room_id, experience_id, rating = old
+                apply_rating_delta(Room, room_id, -1, -rating)
+                apply_rating_delta(Experience, experience_id, -1, -rating)
+            apply_rating_delta(Room, instance.room_id, 1, instance.rating)
+            apply_rating_delta(Experience, instance.experience_id, 1, instance.rating)
+    instance._rating_snapshot = _snapshot(instance)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    room_id, experience_id, rating = instance._rating_snapshot or (
+        instance.room_id,
+        instance.experience_id,
+        instance.rating,
+    )
+    with transaction.atomic():
+        apply_rating_delta(Room, room_id, -1, -rating)
+        apply_rating_delta(Experience, experience_id, -1, -rating)
@@ -1,3 +1,87 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from experiences.models import Experience
+from rooms.models import Room
+from rooms.testing import create_room
+from users.models import User
+from .models import Review
+
+
+class TestRatingAggregates(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="test")
+        self.room = create_room(self.user)
+
+    def create_review(self, rating, room=None):
+        return Review.objects.create(
+            user=self.user,
+            room=room or self.room,
+            payload="Payload",
+            rating=rating,
+        )
+
+    def test_create_update_delete(self):
+        review = self.create_review(5)
+        self.create_review(2)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.review_count, 2)
+        self.assertEqual(self.room.rating(), 3.5)
+
+        review = Review.objects.get(pk=review.pk)
+        review.rating = 3
+        review.save()
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.review_count, 2)
+        self.assertEqual(self.room.rating(), 2.5)
+
+        other_room = create_room(self.user, "Other")
+        review.room = other_room
+        review.save()
+        self.room.refresh_from_db()
+        other_room.refresh_from_db()
+        self.assertEqual(self.room.rating(), 2)
+        self.assertEqual(other_room.rating(), 3)
+
+        review.delete()
+        other_room.refresh_from_db()
+        self.assertEqual(other_room.review_count, 0)
+        self.assertEqual(other_room.rating(), 0)
+
+    def test_rebuild_ratings(self):
+        self.create_review(4)
+        self.create_review(1)
+        Room.objects.update(review_count=0, rating_sum=0)
+
+        call_command("rebuild_ratings", stdout=StringIO())
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.review_count, 2)
+        self.assertEqual(self.room.rating_sum, 5)
+
+    def test_payloads(self):
+        experience = Experience.objects.create(
+            country="Korea",
+            city="Seoul",
+            name="Tour",
+            host=self.user,
+            price=10,
+            address="Address",
+            start="10:00",
+            end="12:00",
+            description="Description",
+        )
+        self.create_review(4)
+        Review.objects.create(
+            user=self.user, experience=experience, payload="Payload", rating=3
+        )
+
+        room = self.client.get(f"/api/v1/rooms/{self.room.pk}/").json()
+        self.assertEqual(room["rating"], 4)
+        experience = self.client.get("/api/v1/experiences/").json()[0]
+        self.assertEqual(experience["rating"], 3)
+        # The aggregates behind them stay internal.
+        for payload in (room, experience):
+            self.assertNotIn("rating_sum", payload)
+            self.assertNotIn("review_count", payload)
@@ -42,6 +42,17 @@ class RoomAdmin(admin.ModelAdmin):
         "price",
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_rating().with_amenity_count()
+
+    @admin.display(description="Total amenities", ordering="amenity_count")
+    def total_amenities(self, room):
+        return room.total_amenities()
+
+    @admin.display(description="Rating", ordering="avg_rating")
+    def rating(self, room):
+        return room.rating()
+
 
 @admin.register(Amenity)
 class AmenityAdmin(admin.ModelAdmin):
@@ -0,0 +1,198 @@
+from django.conf import settings
+from django.db import transaction
+
+from categories.catalog import category_catalog
+from categories.models import Category
+from medias.models import Photo
+from common.cache import bump_generation
+from common.streaming import read_csv, read_ndjson
+from .catalog import amenity_catalog
+from .models import Amenity, Room
+from .serializers import RoomImportSerializer
+
+FIELDS = [
+    "name",
+    "country",
+    "city",
+    "price",
+    "rooms",
+    "toilets",
+    "description",
+    "address",
+    "pet_friendly",
+    "kind",
+    "latitude",
+    "longitude",
+    "category",
+    "amenities",
+    "photos",
+]
+
+LIST_FIELDS = ["amenities", "photos"]
+
+
+def read_records(lines, format):
+    if format == "csv":
+        return read_csv(lines, LIST_FIELDS)
+    return read_ndjson(lines)
+
+
+class RoomImporter:
+    """
+    Creates rooms, with their amenities and photos, from (line, record)
+    pairs as read by read_records().
+
+    Records are validated and written a chunk at a time: one bulk_create for
+    the rooms, one for the amenity links and one for the photos. Categories
+    and amenities are looked up by name in dicts loaded once. Amenities are
+    shared by every room, so unknown ones are only created with
+    `create_amenities`, otherwise the record is invalid. Invalid records are
+    skipped and reported by line.
+    """
+
+    max_errors = 100
+
+    def __init__(self, owner, chunk_size=None, create_amenities=False):
+        self.owner = owner
+        self.chunk_size = chunk_size or settings.BULK_IMPORT_CHUNK_SIZE
+        self.create_amenities = create_amenities
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.categories = {
+            category.name: category.pk
+            for category in category_catalog.all()
+            if category.kind == Category.CategoryKindChoices.ROOMS
+        }
+        self.amenities = {amenity.name: amenity.pk for amenity in amenity_catalog.all()}
+
+    def run(self, records):
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) == self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+        return {"created": self.created, "failed": self.failed, "errors": self.errors}
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "errors": errors})
+
+    def validate(self, line, record):
+        if record is None:
+            self.add_error(line, {"non_field_errors": ["Invalid record."]})
+            return None
+        serializer = RoomImportSerializer(data=record)
+        if not serializer.is_valid():
+            self.add_error(line, serializer.errors)
+            return None
+        values = dict(serializer.validated_data)
+        category = values.pop("category", None)
+        if category:
+            if category not in self.categories:
+                self.add_error(line, {"category": [f"Category {category} not found."]})
+                return None
+            values["category_id"] = self.categories[category]
+        if not self.create_amenities:
+            missing = [
+                name
+                for name in values.get("amenities", [])
+                if name not in self.amenities
+            ]
+            if missing:
+                self.add_error(
+                    line,
+                    {"amenities": [f"Amenity {name} not found." for name in missing]},
+                )
+                return None
+        return values
+
+    def import_chunk(self, chunk):
+        rows = []
+        for line, record in chunk:
+            values = self.validate(line, record)
+            if values is not None:
+                rows.append(values)
+        if not rows:
+            return
+
+        new_amenities = {
+            name
+            for values in rows
+            for name in values.get("amenities", [])
+            if name not in self.amenities
+        }
+        with transaction.atomic():
+            if new_amenities:
+                created = Amenity.objects.bulk_create(
+                    [Amenity(name=name) for name in sorted(new_amenities)]
+                )
+                self.amenities.update((amenity.name, amenity.pk) for amenity in created)
+
+            rooms = []
+            for values in rows:
+                values = {
+                    key: value
+                    for key, value in values.items()
+                    if key not in LIST_FIELDS
+                }
+                room = Room(owner=self.owner, **values)
+                room.update_geohash()
+                rooms.append(room)
+            rooms = Room.objects.bulk_create(rooms)
+
+            through = Room.amenities.through
+            through.objects.bulk_create(
+                [
+                    through(room_id=room.pk, amenity_id=self.amenities[name])
+                    for room, values in zip(rooms, rows)
+                    for name in dict.fromkeys(values.get("amenities", []))
+                ],
+                batch_size=self.chunk_size,
+            )
+            Photo.objects.bulk_create(
+                [
+                    Photo(room=room, file=url, description="")
+                    for room, values in zip(rooms, rows)
+                    for url in values.get("photos", [])
+                ],
+                batch_size=self.chunk_size,
+            )
+        # bulk_create() sends no post_save.
+        bump_generation(Room, Amenity, Photo)
+        self.created += len(rooms)
+
+
+def export_rooms(rooms, chunk_size=None):
+    """
+    Yield rooms as records in the import format. The rooms are read with
+    iterator(), from a server-side cursor where the database has them, so
+    only a chunk is in memory at a time.
+    """
+    rooms = (
+        rooms.select_related("category")
+        .prefetch_related("amenities", "photos")
+        .order_by("pk")
+    )
+    for room in rooms.iterator(chunk_size=chunk_size or settings.BULK_IMPORT_CHUNK_SIZE):
+        yield {
+            "name": room.name,
+            "country": room.country,
+            "city": room.city,
+            "price": room.price,
+            "rooms": room.rooms,
+            "toilets": room.toilets,
+            "description": room.description,
+            "address": room.address,
+            "pet_friendly": room.pet_friendly,
+            "kind": room.kind,
+            "latitude": room.latitude,
+            "longitude": room.longitude,
+            "category": room.category.name if room.category else None,
+            "amenities": [amenity.name for amenity in room.amenities.all()],
+            "photos": [photo.file for photo in room.photos.all()],
+        }
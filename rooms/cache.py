@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from categories.models import Category
+from common.cache import bump_object_generations, get_generations, make_key
+from .models import Amenity, Room
+
+
+def payload_key(pk):
+    return make_key("rooms", "payload", pk)
+
+
+def bump_room_versions(*pks):
+    """Invalidate the cached payloads of these rooms."""
+    bump_object_generations(Room, *pks)
+
+
+def get_room_payload(pk):
+    """
+    The user-independent RoomDetailSerializer payload of a room, or None
+    when there is no such room.
+
+    The entry is stored with the generations it was built from: the room's
+    own, and those of the amenities and categories it shows. A hot room
+    costs two cache round trips and no query. Returns a dict with the
+    serialized "data", the "owner_id" to work out is_owner and the
+    "version" to build the ETag from.
+    """
+    from .serializers import RoomDetailSerializer
+
+    version = tuple(get_generations([(Room, pk), Amenity, Category]))
+    entry = cache.get(payload_key(pk))
+    if entry is not None and entry["version"] == version:
+        return entry
+
+    try:
+        room = (
+            Room.objects.select_related("owner", "category")
+            .prefetch_related("amenities", "photos")
+            .get(pk=pk)
+        )
+    except Room.DoesNotExist:
+        return None
+    entry = {
+        "version": version,
+        "owner_id": room.owner_id,
+        "data": dict(RoomDetailSerializer(room).data),
+    }
+    cache.set(payload_key(pk), entry, settings.ROOM_PAYLOAD_CACHE_TTL)
+    return entry
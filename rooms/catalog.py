@@ -0,0 +1,5 @@
+from common.catalog import Catalog
+
+from .models import Amenity
+
+amenity_catalog = Catalog(Amenity)
@@ -0,0 +1,104 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from categories.catalog import category_catalog
+from categories.models import Category
+from common.cache import CacheNamespace
+from .catalog import amenity_catalog
+from .filters import filter_rooms
+from .models import Room
+
+_facets = CacheNamespace("rooms:facets")
+
+
+def get_price_buckets():
+    bounds = [0, *settings.PRICE_BUCKETS, None]
+    return list(zip(bounds, bounds[1:]))
+
+
+def compute_facets(filters):
+    """
+    Count the rooms matching `filters` per kind, city, category, amenity and
+    price bucket.
+
+    The categories and amenities come from their catalogs, and all the
+    counts from one query grouped by city, with a conditional
+    COUNT(DISTINCT id) column per facet value; the other facets are summed
+    over the cities here. Distinct counts keep the amenity join from
+    counting a room twice.
+    """
+    categories = [
+        {"pk": category.pk, "name": category.name}
+        for category in category_catalog.all()
+        if category.kind == Category.CategoryKindChoices.ROOMS
+    ]
+    amenities = [
+        {"pk": amenity.pk, "name": amenity.name} for amenity in amenity_catalog.all()
+    ]
+    kinds = Room.RoomKindChoices.choices
+    buckets = get_price_buckets()
+
+    def count(condition=None):
+        return Count("pk", distinct=True, filter=condition)
+
+    aggregates = {"total": count()}
+    for i, (value, _) in enumerate(kinds):
+        aggregates[f"kind_{i}"] = count(Q(kind=value))
+    for category in categories:
+        aggregates[f"category_{category['pk']}"] = count(Q(category=category["pk"]))
+    for amenity in amenities:
+        aggregates[f"amenity_{amenity['pk']}"] = count(Q(amenities=amenity["pk"]))
+    for i, (low, high) in enumerate(buckets):
+        price = Q(price__gte=low)
+        if high is not None:
+            price &= Q(price__lt=high)
+        aggregates[f"price_{i}"] = count(price)
+
+    rows = list(
+        filter_rooms(Room.objects.all(), **filters)
+        .order_by()
+        .values("city")
+        .annotate(**aggregates)
+    )
+
+    def total(column):
+        return sum(row[column] for row in rows)
+
+    return {
+        "total": total("total"),
+        "kind": [
+            {"value": value, "label": label, "count": total(f"kind_{i}")}
+            for i, (value, label) in enumerate(kinds)
+        ],
+        "city": sorted(
+            ({"value": row["city"], "count": row["total"]} for row in rows),
+            key=lambda city: (-city["count"], city["value"]),
+        ),
+        "category": [
+            {**category, "count": count}
+            for category in categories
+            if (count := total(f"category_{category['pk']}"))
+        ],
+        "amenity": [
+            {**amenity, "count": count}
+            for amenity in amenities
+            if (count := total(f"amenity_{amenity['pk']}"))
+        ],
+        "price": [
+            {"min": low, "max": high, "count": total(f"price_{i}")}
+            for i, (low, high) in enumerate(buckets)
+        ],
+    }
+
+
+def get_facets(filters):
+    """compute_facets(), cached per filter set for FACETS_CACHE_TTL seconds."""
+    signature = json.dumps(filters, sort_keys=True)
+    return _facets.get_or_set(
+        hashlib.sha1(signature.encode()).hexdigest(),
+        lambda: compute_facets(filters),
+        settings.FACETS_CACHE_TTL,
+    )
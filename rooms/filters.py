@@ -0,0 +1,74 @@
+from django.db.models import Exists, OuterRef
+
+from rest_framework.exceptions import ParseError
+
+from .models import Room
+
+
+def filter_rooms(
+    rooms,
+    city=None,
+    country=None,
+    min_price=None,
+    max_price=None,
+    kind=None,
+    pet_friendly=None,
+    amenities=None,
+    category=None,
+):
+    """
+    Apply the listing filters in SQL. Rooms must have every amenity in
+    `amenities`, each one checked with its own EXISTS so no join multiplies
+    the rows.
+    """
+    if city is not None:
+        rooms = rooms.filter(city=city)
+    if country is not None:
+        rooms = rooms.filter(country=country)
+    if min_price is not None:
+        rooms = rooms.filter(price__gte=min_price)
+    if max_price is not None:
+        rooms = rooms.filter(price__lte=max_price)
+    if kind is not None:
+        rooms = rooms.filter(kind=kind)
+    if pet_friendly is not None:
+        rooms = rooms.filter(pet_friendly=pet_friendly)
+    if category is not None:
+        rooms = rooms.filter(category=category)
+    for amenity_id in amenities or []:
+        rooms = rooms.filter(
+            Exists(
+                Room.amenities.through.objects.filter(
+                    room=OuterRef("pk"),
+                    amenity_id=amenity_id,
+                )
+            )
+        )
+    return rooms
+
+
+def get_room_filters(query_params):
+    """
+    Read the filter_rooms() arguments from query parameters, normalized so
+    equal filter sets give equal dicts (amenities are sorted and unique).
+    """
+    filters = {}
+    try:
+        for param in ("city", "country", "kind"):
+            if query_params.get(param):
+                filters[param] = query_params[param]
+        for param in ("min_price", "max_price", "category"):
+            if query_params.get(param):
+                filters[param] = int(query_params[param])
+        if query_params.get("amenities"):
+            filters["amenities"] = sorted(
+                {int(pk) for pk in query_params["amenities"].split(",")}
+            )
+    except ValueError:
+        raise ParseError("Invalid filter value.")
+    if query_params.get("pet_friendly"):
+        filters["pet_friendly"] = query_params["pet_friendly"].lower() in (
+            "1",
+            "true",
+        )
+    return filters
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from common.streaming import csv_lines, ndjson_lines
+from rooms.bulk import FIELDS, export_rooms
+from rooms.models import Room
+
+
+class Command(BaseCommand):
+
+    help = "Export rooms as NDJSON or CSV, in the import format"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--owner", help="Only the rooms of this username")
+        parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+        parser.add_argument("--chunk-size", type=int)
+
+    def handle(self, *args, **options):
+        rooms = Room.objects.all()
+        if options["owner"]:
+            rooms = rooms.filter(owner__username=options["owner"])
+        rows = export_rooms(rooms, options["chunk_size"])
+        if options["format"] == "csv":
+            lines = csv_lines(rows, FIELDS)
+        else:
+            lines = ndjson_lines(rows)
+        for line in lines:
+            self.stdout.write(line, ending="")
@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rooms.bulk import RoomImporter, read_records
+from users.models import User
+
+
+class Command(BaseCommand):
+
+    help = "Import rooms from an NDJSON or CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--owner", required=True, help="Username of the host")
+        parser.add_argument("--format", choices=["ndjson", "csv"])
+        parser.add_argument("--chunk-size", type=int)
+
+    def handle(self, *args, **options):
+        try:
+            owner = User.objects.get(username=options["owner"])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['owner']} not found.")
+        path = options["path"]
+        format = options["format"] or ("csv" if path.endswith(".csv") else "ndjson")
+        with open(path, encoding="utf-8", newline="") as file:
+            result = RoomImporter(
+                owner,
+                options["chunk_size"],
+                create_amenities=True,
+            ).run(read_records(file, format))
+        for error in result["errors"]:
+            self.stderr.write(f"Line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result['created']} rooms, {result['failed']} failed."
+            )
+        )
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0002_alter_category_options'),
+        ('rooms', '0006_alter_room_amenities_alter_room_category_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['created_at', 'id'], name='rooms_room_created_2438c1_idx'),
+        ),
+    ]
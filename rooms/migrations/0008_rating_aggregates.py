@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0007_room_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:38
+
+import django.core.validators
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0002_alter_category_options'),
+        ('rooms', '0009_room_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='geohash',
+            field=models.CharField(editable=False, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)]),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)]),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['geohash'], name='rooms_room_geohash_1fd650_idx'),
+        ),
+    ]
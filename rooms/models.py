@@ -1,10 +1,119 @@
 from os import name
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Avg, Count, Exists, OuterRef, Q, Subquery, Value
+from common import geohash
 from common.models import CommonModel
 
 # Create your models here.
 
 
+class RoomQuerySet(models.QuerySet):
+    """
+    SQL annotations replacing the per-row Room.rating() / total_amenities()
+    and wishlist lookups. Each one is a correlated subquery so they can be
+    combined without multiplying joined rows.
+    """
+
+    def with_rating(self):
+        from reviews.models import Review
+
+        ratings = (
+            Review.objects.filter(room=OuterRef("pk"))
+            .order_by()
+            .values("room")
+            .annotate(avg=Avg("rating"))
+            .values("avg")
+        )
+        return self.annotate(avg_rating=Subquery(ratings))
+
+    def with_amenity_count(self):
+        amenities = (
+            Room.amenities.through.objects.filter(room=OuterRef("pk"))
+            .order_by()
+            .values("room")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return self.annotate(amenity_count=Subquery(amenities))
+
+    def with_is_liked(self, user):
+        from wishlists.models import Wishlist
+
+        if not user or not user.is_authenticated:
+            return self.annotate(is_liked=Value(False))
+        return self.annotate(
+            is_liked=Exists(Wishlist.objects.filter(user=user, rooms=OuterRef("pk")))
+        )
+
+    def in_cells(self, cells):
+        """Rooms inside any of the geohash cells, as B-tree range scans."""
+        ranges = Q()
+        for low, high in geohash.merge_ranges(map(geohash.cell_range, cells)):
+            cell = Q(geohash__gte=low)
+            if high is not None:
+                cell &= Q(geohash__lt=high)
+            ranges |= cell
+        if not ranges:
+            return self.none()
+        return self.filter(ranges)
+
+    def within_bbox(self, south, west, north, east):
+        """
+        Rooms inside the box. A box with west > east crosses the
+        antimeridian.
+        """
+        if west > east:
+            boxes = [(south, west, north, 180.0), (south, -180.0, north, east)]
+            longitude = Q(longitude__gte=west) | Q(longitude__lte=east)
+        else:
+            boxes = [(south, west, north, east)]
+            longitude = Q(longitude__range=(west, east))
+        cells = set().union(*(geohash.covering_cells(*box) for box in boxes))
+        return self.in_cells(cells).filter(
+            longitude,
+            latitude__range=(south, north),
+        )
+
+    def nearest(self, latitude, longitude, count):
+        """
+        The `count` rooms closest to the point, nearest first, each with its
+        `distance` in kilometers.
+
+        Starts from the cells around the point and widens the search until
+        the k-th candidate is closer than anything outside those cells could
+        be.
+        """
+        for precision in range(7, 0, -1):
+            candidates = self.in_cells(
+                geohash.neighbor_cells(latitude, longitude, precision)
+            )
+            found = self._closest(candidates, latitude, longitude, count)
+            if (
+                len(found) == count
+                and found[-1][0] <= geohash.search_radius(latitude, precision)
+            ):
+                break
+        else:
+            found = self._closest(
+                self.filter(geohash__isnull=False), latitude, longitude, count
+            )
+        rooms = self.in_bulk([pk for _, pk in found])
+        nearest = []
+        for distance, pk in found:
+            room = rooms[pk]
+            room.distance = distance
+            nearest.append(room)
+        return nearest
+
+    def _closest(self, rooms, latitude, longitude, count):
+        distances = sorted(
+            (geohash.distance(latitude, longitude, lat, lng), pk)
+            for pk, lat, lng in rooms.values_list("pk", "latitude", "longitude")
+        )
+        return distances[:count]
+
+
 class Room(CommonModel):
     """
     Room Model Definition
@@ -55,19 +164,62 @@ class Room(CommonModel):
         blank=True,
         related_name="rooms",
     )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    geohash = models.CharField(
+        max_length=12,
+        null=True,
+        editable=False,
+    )
+
+    objects = RoomQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["geohash"]),
+        ]
+
+    def update_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            self.geohash = None
+        else:
+            self.geohash = geohash.encode(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        self.update_geohash()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "geohash"}
+        super().save(*args, **kwargs)
 
     def total_amenities(self):
+        if hasattr(self, "amenity_count"):
+            return self.amenity_count or 0
         return self.amenities.count()
 
     def rating(self):
-        count = self.reviews.count()
-        if count == 0:
+        if hasattr(self, "avg_rating"):
+            return round(self.avg_rating or 0, 2)
+        if self.review_count == 0:
             return 0
-        else:
-            total_rating = 0
-            for review in self.reviews.all().values("rating"):
-                total_rating += review["rating"]
-            return round(total_rating / count, 2)
+        return round(self.rating_sum / self.review_count, 2)
 
     def __str__(self) -> str:
         return self.name
@@ -1,9 +1,59 @@
+import dataclasses
+import typing
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from strawberry.types import Info
+
+from common.paginations import encode_cursor, paginate_by_cursor
+from .filters import filter_rooms
 from .models import Room
+from .search import room_index
+from .types import PageInfo, RoomConnection, RoomEdge, RoomFilter, RoomType
+
+
+async def get_all_rooms(
+    info: Info,
+    first: typing.Optional[int] = None,
+    after: typing.Optional[str] = None,
+    filters: typing.Optional[RoomFilter] = None,
+) -> RoomConnection:
+    rooms = Room.objects.all()
+    if filters is not None:
+        rooms = filter_rooms(rooms, **dataclasses.asdict(filters))
+    page_size = settings.CURSOR_PAGE_SIZE if first is None else first
+    page, next_cursor = await sync_to_async(paginate_by_cursor)(
+        rooms.with_rating().with_is_liked(info.context.request.user),
+        cursor=after,
+        page_size=max(1, min(page_size, settings.MAX_PAGE_SIZE)),
+    )
+    edges = [RoomEdge(cursor=encode_cursor(room), node=room) for room in page]
+    return RoomConnection(
+        edges=edges,
+        page_info=PageInfo(
+            has_next_page=next_cursor is not None,
+            has_previous_page=after is not None,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+        rooms=rooms,
+    )
 
 
-def get_all_rooms():
-    return Room.objects.all()
+async def search_rooms(
+    info: Info,
+    query: str,
+    first: typing.Optional[int] = None,
+    page: int = 1,
+) -> typing.List[RoomType]:
+    page_size = max(1, min(first or settings.CURSOR_PAGE_SIZE, settings.MAX_PAGE_SIZE))
+    start = (max(1, page) - 1) * page_size
+    rooms = room_index.search(
+        Room.objects.with_rating().with_is_liked(info.context.request.user),
+        query,
+    )
+    return [room async for room in rooms[start : start + page_size]]
 
 
-def get_room(id: int):
-    return Room.objects.get(pk=id)
+async def get_room(id: int):
+    return await Room.objects.aget(pk=id)
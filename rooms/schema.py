@@ -1,13 +1,17 @@
 import typing
+
 import strawberry
 
-from rooms.queries import get_all_rooms, get_room
-from rooms.types import RoomType
+from rooms.queries import get_all_rooms, get_room, search_rooms
+from rooms.types import RoomConnection, RoomType
 
 
 @strawberry.type
 class Query:
-    all_rooms: typing.List[RoomType] = strawberry.field(
+    all_rooms: RoomConnection = strawberry.field(
         resolver=get_all_rooms,
     )
+    search_rooms: typing.List[RoomType] = strawberry.field(
+        resolver=search_rooms,
+    )
     room: RoomType = strawberry.field(resolver=get_room)
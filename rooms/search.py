@@ -0,0 +1,3 @@
+from common.search import SearchIndex
+
+room_index = SearchIndex("rooms_room", ["name", "description", "city", "address"])
@@ -1,9 +1,15 @@
 # DRF Import
-from rest_framework.serializers import ModelSerializer, SerializerMethodField
+from rest_framework.serializers import (
+    CharField,
+    ListField,
+    ModelSerializer,
+    SerializerMethodField,
+    URLField,
+)
 
 # Model Import
 from .models import Amenity, Room
-from wishlists.models import Wishlist
+from wishlists.cache import get_liked_room_ids
 
 # Serializers Import
 from users.serializers import TinyUserSerializer
@@ -22,11 +28,26 @@ class AmenitySerializer(ModelSerializer):
         )
 
 
+def is_liked(serializer, room):
+    """
+    Whether the request user liked the room, checked against their liked
+    room ids, loaded once per request and shared through the context.
+    """
+    if hasattr(room, "is_liked"):
+        return room.is_liked
+    context = serializer.context
+    if "liked_rooms" not in context:
+        request = context.get("request")
+        context["liked_rooms"] = get_liked_room_ids(request.user if request else None)
+    return room.pk in context["liked_rooms"]
+
+
 class RoomDetailSerializer(ModelSerializer):
 
     class Meta:
         model = Room
-        fields = "__all__"
+        # The aggregates behind rating, and the location index column.
+        exclude = ("rating_sum", "review_count", "geohash")
 
     owner = TinyUserSerializer(read_only=True)
     amenities = AmenitySerializer(read_only=True, many=True)
@@ -43,18 +64,11 @@ class RoomDetailSerializer(ModelSerializer):
     def get_is_owner(self, room):
         request = self.context.get("request")
         if request:
-            return room.owner == request.user
+            return room.owner_id == request.user.pk
         return False
 
     def get_is_liked(self, room):
-        request = self.context.get("request")
-        if request:
-            if request.user.is_authenticated:
-                return Wishlist.objects.filter(
-                    user=request.user, rooms__pk=room.pk
-                ).exists()
-
-        return False
+        return is_liked(self, room)
 
 
 class RoomListSerializer(ModelSerializer):
@@ -70,16 +84,49 @@ class RoomListSerializer(ModelSerializer):
             "photos",
             "rating",
             "is_owner",
+            "is_liked",
         )
 
     photos = PhotoSerializer(read_only=True, many=True)
 
     rating = SerializerMethodField()
     is_owner = SerializerMethodField()
+    is_liked = SerializerMethodField()
 
     def get_rating(self, room):
         return room.rating()
 
     def get_is_owner(self, room):
         request = self.context["request"]
-        return room.owner == request.user
+        return room.owner_id == request.user.pk
+
+    def get_is_liked(self, room):
+        return is_liked(self, room)
+
+
+class RoomImportSerializer(ModelSerializer):
+    """One record of a bulk import, categories and amenities by name."""
+
+    category = CharField(required=False, allow_blank=True, allow_null=True)
+    amenities = ListField(child=CharField(max_length=50), required=False)
+    photos = ListField(child=URLField(), required=False)
+
+    class Meta:
+        model = Room
+        fields = (
+            "name",
+            "country",
+            "city",
+            "price",
+            "rooms",
+            "toilets",
+            "description",
+            "address",
+            "pet_friendly",
+            "kind",
+            "latitude",
+            "longitude",
+            "category",
+            "amenities",
+            "photos",
+        )
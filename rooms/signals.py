@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from medias.models import Photo
+from reviews.models import Review
+from users.models import User
+
+from .cache import bump_room_versions
+from .models import Room
+
+# The owner fields in the payload (TinyUserSerializer).
+OWNER_FIELDS = {"name", "avatar", "username"}
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def bump_room(sender, instance, **kwargs):
+    # Amenities set along with the room are covered by its save. Amenity
+    # and category changes bump their model's generation (common.signals).
+    bump_room_versions(instance.pk)
+
+
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Photo)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_related_room(sender, instance, **kwargs):
+    if instance.room_id:
+        bump_room_versions(instance.room_id)
+
+
+@receiver(post_save, sender=User)
+def bump_owner_rooms(sender, instance, created, update_fields, **kwargs):
+    if created or (update_fields is not None and not OWNER_FIELDS & set(update_fields)):
+        # Logins only save last_login.
+        return
+    bump_room_versions(*Room.objects.filter(owner=instance).values_list("pk", flat=True))
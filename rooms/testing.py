@@ -0,0 +1,18 @@
+from .models import Room
+
+
+def create_room(owner, name="Room", **fields):
+    """A room of `owner`, required fields the test doesn't set filled in."""
+    return Room.objects.create(
+        **{
+            "price": 100,
+            "rooms": 1,
+            "toilets": 1,
+            "description": "Description",
+            "address": "Address",
+            "kind": Room.RoomKindChoices.ENTIRE_PLACE,
+            **fields,
+        },
+        owner=owner,
+        name=name,
+    )
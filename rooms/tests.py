@@ -1,6 +1,27 @@
+import csv
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
+from common import geohash
+from common.cache import generation_key
 from . import models
+from .catalog import amenity_catalog
+from .testing import create_room
 from users.models import User
+from categories.catalog import category_catalog
+from categories.models import Category
 
 
 class TestAmenities(APITestCase):
@@ -45,6 +66,30 @@ class TestAmenities(APITestCase):
         self.assertIn("name", data)
 
 
+class TestAmenityCatalog(APITestCase):
+    def setUp(self):
+        self.amenity = models.Amenity.objects.create(name="Wifi")
+
+    def test_catalog(self):
+        amenity_catalog.all()
+        with self.assertNumQueries(0):
+            self.assertEqual(amenity_catalog.get(self.amenity.pk).name, "Wifi")
+            self.assertEqual(amenity_catalog.get(str(self.amenity.pk)), self.amenity)
+            self.assertEqual(
+                amenity_catalog.in_bulk([self.amenity.pk, 0]),
+                {self.amenity.pk: self.amenity},
+            )
+            with self.assertRaises(models.Amenity.DoesNotExist):
+                amenity_catalog.get("wifi")
+
+        # Saves and deletes reload it.
+        self.amenity.name = "Fast wifi"
+        self.amenity.save()
+        self.assertEqual(amenity_catalog.get(self.amenity.pk).name, "Fast wifi")
+        self.amenity.delete()
+        self.assertEqual(amenity_catalog.all(), [])
+
+
 class TestAmenity(APITestCase):
     NAME = "Testing"
     DESC = "Description"
@@ -89,3 +134,870 @@ class TestRooms(APITestCase):
         response = self.client.post("/api/v1/rooms/")
 
         self.assertEqual(response.status_code, 400)
+
+    def test_room_amenities(self):
+        category = Category.objects.create(
+            name="Rooms", kind=Category.CategoryKindChoices.ROOMS
+        )
+        amenities = [models.Amenity.objects.create(name=f"{i}") for i in range(40)]
+        data = {
+            "name": "Room",
+            "price": 100,
+            "rooms": 1,
+            "toilets": 1,
+            "description": "Description",
+            "address": "Address",
+            "kind": "entire_place",
+            "category": category.pk,
+            "amenities": [amenity.pk for amenity in amenities] + [0, -1],
+        }
+        self.client.force_authenticate(self.user)
+        response = self.client.post("/api/v1/rooms/", data, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {"amenities": ["Amenity 0 not found.", "Amenity -1 not found."]},
+        )
+        self.assertFalse(models.Room.objects.exists())
+
+        data["amenities"] = data["amenities"][:-2]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/api/v1/rooms/", data, format="json")
+        room = models.Room.objects.get()
+        self.assertEqual(room.amenities.count(), 40)
+        amenity_queries = [
+            query for query in queries if "amenit" in query["sql"]
+        ]
+        # One insert, then the response: validation reads the catalog.
+        self.assertEqual(len(amenity_queries), 2)
+
+        response = self.client.put(
+            f"/api/v1/rooms/{room.pk}/",
+            {"amenities": [amenities[0].pk, amenities[1].pk]},
+            format="json",
+        )
+        self.assertEqual(len(response.json()["amenities"]), 2)
+        response = self.client.put(
+            f"/api/v1/rooms/{room.pk}/", {"amenities": ["wifi"]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_streaming_formats(self):
+        for i in range(5):
+            room = create_room(self.user, f"Room {i}")
+            room.photos.create(file="https://example.com/photo.jpg", description="")
+
+        with self.settings(STREAMING_CHUNK_SIZE=2):
+            response = self.client.get("/api/v1/rooms/", {"format": "ndjson"})
+            self.assertTrue(response.streaming)
+            self.assertEqual(response["Content-Type"], "application/x-ndjson")
+            # one rooms cursor, then the photos of each chunk of 2
+            with self.assertNumQueries(4):
+                lines = b"".join(response.streaming_content).decode().splitlines()
+        rooms = [json.loads(line) for line in lines]
+        self.assertEqual([room["name"] for room in rooms], [f"Room {i}" for i in range(5)])
+        self.assertEqual(rooms[0]["photos"][0]["file"], "https://example.com/photo.jpg")
+
+        response = self.client.get("/api/v1/rooms/", {"format": "csv"})
+        rows = list(
+            csv.DictReader(StringIO(b"".join(response.streaming_content).decode()))
+        )
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(
+            json.loads(rows[0]["photos"])[0]["file"], "https://example.com/photo.jpg"
+        )
+
+        response = self.client.get("/api/v1/rooms/amenities/", {"format": "csv"})
+        self.assertEqual(b"".join(response.streaming_content), b"pk,name,description\r\n")
+
+        response = self.client.get("/api/v1/rooms/")
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.json()), 5)
+
+    def test_cursor_pagination(self):
+        for i in range(5):
+            room = create_room(self.user, f"Room {i}")
+            room.photos.create(file="https://example.com/photo.jpg", description="")
+
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/v1/rooms/", {"page_size": 2})
+        data = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([room["name"] for room in data["results"]], ["Room 4", "Room 3"])
+        self.assertEqual(len(data["results"][0]["photos"]), 1)
+
+        seen = [room["pk"] for room in data["results"]]
+        while data["next"]:
+            response = self.client.get(
+                "/api/v1/rooms/", {"page_size": 2, "cursor": data["next"]}
+            )
+            data = response.json()
+            seen += [room["pk"] for room in data["results"]]
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+        response = self.client.get("/api/v1/rooms/", {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestRoomQuerySet(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="test")
+        self.room = create_room(self.user)
+        self.room.amenities.add(
+            models.Amenity.objects.create(name="Wifi"),
+            models.Amenity.objects.create(name="Kitchen"),
+        )
+        self.room.reviews.create(user=self.user, payload="Good", rating=5)
+        self.room.reviews.create(user=self.user, payload="Bad", rating=2)
+        self.user.wishlists.create(name="Wishlist").rooms.add(self.room)
+
+    def test_annotations(self):
+        with self.assertNumQueries(1):
+            room = (
+                models.Room.objects.with_rating()
+                .with_amenity_count()
+                .with_is_liked(self.user)
+                .get(pk=self.room.pk)
+            )
+            self.assertEqual(room.rating(), 3.5)
+            self.assertEqual(room.total_amenities(), 2)
+            self.assertTrue(room.is_liked)
+
+        other = User.objects.create(username="other")
+        self.assertFalse(models.Room.objects.with_is_liked(other).get().is_liked)
+
+    def test_graphql_all_rooms(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            "/graphql",
+            {"query": "{ allRooms { edges { node { name rating isLiked } } } }"},
+            format="json",
+        )
+        self.assertEqual(
+            response.json()["data"]["allRooms"]["edges"],
+            [{"node": {"name": "Room", "rating": "3.5", "isLiked": True}}],
+        )
+
+
+class TestRoomsGraphQL(APITestCase):
+    QUERY = """
+    {
+        allRooms {
+            edges {
+                node {
+                    name
+                    rating
+                    isOwner
+                    isLiked
+                    owner { username }
+                    reviews { rating }
+                }
+            }
+        }
+    }
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(username="test")
+        for i in range(5):
+            owner = User.objects.create(username=f"owner{i}")
+            room = create_room(owner, f"Room {i}")
+            for rating in range(1, 6):
+                room.reviews.create(user=self.user, payload="Review", rating=rating)
+
+    def test_batched_resolvers(self):
+        self.client.force_login(self.user)
+        # session, user, rooms, owners, reviews
+        with self.assertNumQueries(5):
+            response = self.client.post("/graphql", {"query": self.QUERY}, format="json")
+        rooms = [edge["node"] for edge in response.json()["data"]["allRooms"]["edges"]]
+        self.assertEqual(len(rooms), 5)
+        self.assertEqual(rooms[2]["owner"]["username"], "owner2")
+        self.assertEqual([review["rating"] for review in rooms[2]["reviews"]], [1, 2, 3])
+        self.assertEqual(rooms[2]["rating"], "3.0")
+
+    def test_room_reviews_page(self):
+        room = models.Room.objects.get(name="Room 0")
+        response = self.client.post(
+            "/graphql",
+            {"query": "{ room(id: %d) { isLiked reviews(page: 2) { rating } } }" % room.pk},
+            format="json",
+        )
+        data = response.json()["data"]["room"]
+        self.assertEqual([review["rating"] for review in data["reviews"]], [4, 5])
+        self.assertFalse(data["isLiked"])
+
+    def test_query_cost(self):
+        response = self.client.post("/graphql", {"query": self.QUERY}, format="json")
+        cost = response.json()["extensions"]["cost"]
+        # allRooms 1 + edges (1 + CURSOR_PAGE_SIZE * (node 1 + owner 1 + reviews 1))
+        self.assertEqual(cost["requested"], 62)
+
+        response = self.client.post(
+            "/graphql",
+            {"query": self.QUERY.replace("allRooms", "allRooms(first: 5)")},
+            format="json",
+        )
+        self.assertEqual(response.json()["extensions"]["cost"]["requested"], 17)
+
+        with self.settings(GRAPHQL_MAX_QUERY_COST=61):
+            response = self.client.post(
+                "/graphql", {"query": self.QUERY}, format="json"
+            )
+        data = response.json()
+        self.assertIsNone(data["data"])
+        self.assertIn("exceeds", data["errors"][0]["message"])
+
+    def test_persisted_query(self):
+        cache.clear()
+        query = "{ allRooms { edges { node { name } } } }"
+        extensions = {
+            "persistedQuery": {
+                "version": 1,
+                "sha256Hash": hashlib.sha256(query.encode()).hexdigest(),
+            }
+        }
+        response = self.client.post(
+            "/graphql", {"extensions": extensions}, format="json"
+        )
+        error = response.json()["errors"][0]
+        self.assertEqual(error["extensions"]["code"], "PERSISTED_QUERY_NOT_FOUND")
+
+        response = self.client.post(
+            "/graphql", {"query": query, "extensions": extensions}, format="json"
+        )
+        self.assertEqual(len(response.json()["data"]["allRooms"]["edges"]), 5)
+
+        response = self.client.get(
+            "/graphql",
+            {"extensions": json.dumps(extensions)},
+            HTTP_ACCEPT="application/json",
+        )
+        self.assertEqual(len(response.json()["data"]["allRooms"]["edges"]), 5)
+
+        response = self.client.post(
+            "/graphql",
+            {"query": "{ allRooms { totalCount } }", "extensions": extensions},
+            format="json",
+        )
+        self.assertEqual(response.json()["errors"][0]["extensions"]["code"], "BAD_REQUEST")
+
+    def test_connection(self):
+        query = """
+        query ($after: String) {
+            allRooms(first: 2, after: $after) {
+                totalCount
+                edges { node { name } }
+                pageInfo { hasNextPage endCursor }
+            }
+        }
+        """
+        names = []
+        after = None
+        while True:
+            response = self.client.post(
+                "/graphql",
+                {"query": query, "variables": {"after": after}},
+                format="json",
+            )
+            connection = response.json()["data"]["allRooms"]
+            self.assertEqual(connection["totalCount"], 5)
+            names += [edge["node"]["name"] for edge in connection["edges"]]
+            if not connection["pageInfo"]["hasNextPage"]:
+                break
+            after = connection["pageInfo"]["endCursor"]
+        self.assertEqual(names, [f"Room {i}" for i in reversed(range(5))])
+
+    def test_filters(self):
+        wifi = models.Amenity.objects.create(name="Wifi")
+        kitchen = models.Amenity.objects.create(name="Kitchen")
+        rooms = models.Room.objects.order_by("pk")
+        rooms[0].amenities.add(wifi, kitchen)
+        rooms[1].amenities.add(wifi)
+        models.Room.objects.filter(pk=rooms[2].pk).update(price=300)
+        query = """
+        query ($filters: RoomFilter) {
+            allRooms(filters: $filters) {
+                totalCount
+                edges { node { name } }
+            }
+        }
+        """
+
+        def names(filters):
+            response = self.client.post(
+                "/graphql",
+                {"query": query, "variables": {"filters": filters}},
+                format="json",
+            )
+            connection = response.json()["data"]["allRooms"]
+            self.assertEqual(connection["totalCount"], len(connection["edges"]))
+            return [edge["node"]["name"] for edge in connection["edges"]]
+
+        self.assertEqual(names({"amenities": [wifi.pk]}), ["Room 1", "Room 0"])
+        self.assertEqual(names({"amenities": [wifi.pk, kitchen.pk]}), ["Room 0"])
+        self.assertEqual(names({"minPrice": 200}), ["Room 2"])
+        self.assertEqual(names({"maxPrice": 200, "kind": "shared_room"}), [])
+
+
+class TestRoomSearch(APITestCase):
+    URL = "/api/v1/rooms/search/"
+
+    def create_room(self, name, description="Description", city="Seoul"):
+        return create_room(self.user, name, description=description, city=city)
+
+    def setUp(self):
+        self.user = User.objects.create(username="test")
+        self.seaside = self.create_room("Seaside villa", "Quiet villa by the sea")
+        self.loft = self.create_room("City loft", "Loft with a sea view", city="Busan")
+        self.create_room("Mountain cabin", "Cabin in the woods")
+
+    def search(self, query):
+        response = self.client.get(self.URL, {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return [room["name"] for room in response.json()]
+
+    def test_ranked_prefix_search(self):
+        self.assertEqual(self.search("villa sea"), ["Seaside villa"])
+        self.assertEqual(self.search("sea"), ["Seaside villa", "City loft"])
+        self.assertEqual(self.search("busa"), ["City loft"])
+        self.assertEqual(self.search("beach"), [])
+
+    def test_index_follows_writes(self):
+        self.loft.name = "Harbour loft"
+        self.loft.save()
+        self.assertEqual(self.search("harbour"), ["Harbour loft"])
+        self.assertEqual(self.search("city"), [])
+
+        self.seaside.delete()
+        self.assertEqual(self.search("sea"), ["Harbour loft"])
+
+    def test_other_databases(self):
+        # No full-text index: plain lookups, newest first.
+        with mock.patch("common.search.connection", mock.Mock(vendor="mysql")):
+            self.assertEqual(self.search("villa sea"), ["Seaside villa"])
+            self.assertEqual(self.search("sea"), ["City loft", "Seaside villa"])
+            self.assertEqual(self.search("beach"), [])
+
+    def test_query_required(self):
+        response = self.client.get(self.URL, {"q": "  "})
+        self.assertEqual(response.status_code, 400)
+
+    def test_graphql(self):
+        response = self.client.post(
+            "/graphql",
+            {"query": '{ searchRooms(query: "cabin woods") { name } }'},
+            format="json",
+        )
+        self.assertEqual(
+            response.json()["data"]["searchRooms"],
+            [{"name": "Mountain cabin"}],
+        )
+
+
+class TestRoomLocation(APITestCase):
+    PLACES = {
+        "City Hall": (37.5663, 126.9779),
+        "Gangnam": (37.4979, 127.0276),
+        "Busan": (35.1796, 129.0756),
+        "Tokyo": (35.6762, 139.6503),
+    }
+
+    def create_room(self, name, latitude=None, longitude=None):
+        return create_room(self.user, name, latitude=latitude, longitude=longitude)
+
+    def setUp(self):
+        self.user = User.objects.create(username="test")
+        for name, (latitude, longitude) in self.PLACES.items():
+            self.create_room(name, latitude, longitude)
+        self.create_room("Nowhere")
+
+    def test_geohash(self):
+        self.assertEqual(geohash.encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        room = models.Room.objects.get(name="Tokyo")
+        self.assertEqual(room.geohash, "xn76cydhz")
+        room.latitude = None
+        room.save(update_fields=["latitude"])
+        room.refresh_from_db()
+        self.assertIsNone(room.geohash)
+
+        # An index, not part of the API.
+        data = self.client.get(f"/api/v1/rooms/{room.pk}/").json()
+        self.assertIn("latitude", data)
+        self.assertNotIn("geohash", data)
+
+    def test_nearby(self):
+        response = self.client.get(
+            "/api/v1/rooms/nearby/", {"lat": 37.5547, "lng": 126.9707, "k": 2}
+        )
+        rooms = response.json()
+        self.assertEqual([room["name"] for room in rooms], ["City Hall", "Gangnam"])
+        self.assertAlmostEqual(rooms[0]["distance"], 1.45, places=1)
+
+        response = self.client.get(
+            "/api/v1/rooms/nearby/", {"lat": 37.5547, "lng": 126.9707, "k": 10}
+        )
+        self.assertEqual(
+            [room["name"] for room in response.json()],
+            ["City Hall", "Gangnam", "Busan", "Tokyo"],
+        )
+
+        response = self.client.get("/api/v1/rooms/nearby/", {"lat": 100, "lng": 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(14)
+        for i in range(100):
+            self.create_room(
+                f"Room {i}", rng.uniform(33, 39), rng.uniform(124, 131)
+            )
+        located = models.Room.objects.filter(latitude__isnull=False)
+        for _ in range(10):
+            latitude, longitude = rng.uniform(33, 39), rng.uniform(124, 131)
+            expected = sorted(
+                located,
+                key=lambda room: geohash.distance(
+                    latitude, longitude, room.latitude, room.longitude
+                ),
+            )[:5]
+            self.assertEqual(
+                models.Room.objects.nearest(latitude, longitude, 5), expected
+            )
+
+    def test_map(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                "/api/v1/rooms/map/", {"bbox": "126.9,37.4,127.1,37.6"}
+            )
+        self.assertEqual(
+            sorted(room["name"] for room in response.json()),
+            ["City Hall", "Gangnam"],
+        )
+
+        response = self.client.get("/api/v1/rooms/map/", {"bbox": "1,2,3"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_map_across_antimeridian(self):
+        self.create_room("East", 0, 179.5)
+        self.create_room("West", 0, -179.5)
+        self.create_room("Greenwich", 0, 0)
+        response = self.client.get("/api/v1/rooms/map/", {"bbox": "179,-1,-179,1"})
+        self.assertEqual(
+            sorted(room["name"] for room in response.json()),
+            ["East", "West"],
+        )
+
+
+class TestRoomsFacets(APITestCase):
+    URL = "/api/v1/rooms/facets/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="test")
+        self.category = Category.objects.create(
+            name="Beach", kind=Category.CategoryKindChoices.ROOMS
+        )
+        self.wifi = models.Amenity.objects.create(name="Wifi")
+        self.kitchen = models.Amenity.objects.create(name="Kitchen")
+        models.Amenity.objects.create(name="Pool")
+        for name, city, price, kind, amenities in [
+            ("A", "Seoul", 40, "entire_place", [self.wifi, self.kitchen]),
+            ("B", "Seoul", 150, "private_room", [self.wifi]),
+            ("C", "Busan", 150, "entire_place", []),
+            ("D", "Busan", 900, "shared_room", [self.kitchen]),
+        ]:
+            room = create_room(
+                self.user,
+                name,
+                city=city,
+                price=price,
+                kind=kind,
+                category=self.category if city == "Busan" else None,
+            )
+            room.amenities.set(amenities)
+
+    def test_facets(self):
+        amenity_catalog.all()
+        category_catalog.all()
+        # The names come from the catalogs: one aggregate.
+        with self.assertNumQueries(1):
+            facets = self.client.get(self.URL).json()
+        self.assertEqual(facets["total"], 4)
+        self.assertEqual(
+            {kind["value"]: kind["count"] for kind in facets["kind"]},
+            {"entire_place": 2, "private_room": 1, "shared_room": 1},
+        )
+        self.assertEqual(
+            facets["city"],
+            [{"value": "Busan", "count": 2}, {"value": "Seoul", "count": 2}],
+        )
+        self.assertEqual(
+            facets["category"],
+            [{"pk": self.category.pk, "name": "Beach", "count": 2}],
+        )
+        self.assertEqual(
+            {amenity["name"]: amenity["count"] for amenity in facets["amenity"]},
+            {"Wifi": 2, "Kitchen": 2},
+        )
+        self.assertEqual(
+            [bucket["count"] for bucket in facets["price"]], [1, 0, 2, 0, 1]
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.URL).json(), facets)
+
+    def test_filtered_facets(self):
+        facets = self.client.get(
+            self.URL, {"amenities": f"{self.wifi.pk}", "max_price": 200}
+        ).json()
+        self.assertEqual(facets["total"], 2)
+        self.assertEqual(facets["city"], [{"value": "Seoul", "count": 2}])
+        self.assertEqual(facets["category"], [])
+
+        response = self.client.get(self.URL, {"amenities": "wifi"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestRoomsBulk(APITestCase):
+    RECORDS = [
+        {
+            "name": "Seaside villa",
+            "price": 200,
+            "rooms": 3,
+            "toilets": 2,
+            "description": "By the sea",
+            "address": "Address",
+            "kind": "entire_place",
+            "category": "Beach",
+            "amenities": ["Wifi", "Pool"],
+            "photos": ["https://example.com/1.jpg", "https://example.com/2.jpg"],
+            "latitude": 35.1796,
+            "longitude": 129.0756,
+        },
+        {
+            "name": "Loft",
+            "price": 80,
+            "rooms": 1,
+            "toilets": 1,
+            "description": "Loft",
+            "address": "Address",
+            "kind": "private_room",
+            "amenities": ["Wifi"],
+        },
+        {
+            "name": "Cabin",
+            "price": 50,
+            "rooms": 1,
+            "toilets": 1,
+            "description": "Cabin",
+            "address": "Address",
+            "kind": "castle",
+        },
+        {
+            "name": "Tent",
+            "price": 10,
+            "rooms": 1,
+            "toilets": 0,
+            "description": "Tent",
+            "address": "Address",
+            "kind": "shared_room",
+            "category": "Unknown",
+        },
+    ]
+
+    def setUp(self):
+        self.user = User.objects.create(username="host")
+        Category.objects.create(name="Beach", kind=Category.CategoryKindChoices.ROOMS)
+        models.Amenity.objects.create(name="Wifi")
+        models.Amenity.objects.create(name="Pool")
+        self.client.force_authenticate(self.user)
+
+    def import_records(self, body, content_type="application/x-ndjson"):
+        with self.settings(BULK_IMPORT_CHUNK_SIZE=2):
+            return self.client.post(
+                "/api/v1/rooms/import/", body, content_type=content_type
+            ).json()
+
+    def test_import_ndjson(self):
+        lines = [json.dumps(record) for record in self.RECORDS]
+        lines.insert(1, "{not json")
+        result = self.import_records("\n".join(lines))
+        self.assertEqual(result["created"], 2)
+        self.assertEqual(result["failed"], 3)
+        self.assertEqual([error["line"] for error in result["errors"]], [2, 4, 5])
+        self.assertIn("kind", result["errors"][1]["errors"])
+        self.assertIn("category", result["errors"][2]["errors"])
+
+        villa = models.Room.objects.get(name="Seaside villa")
+        self.assertEqual(villa.owner, self.user)
+        self.assertEqual(villa.category.name, "Beach")
+        self.assertEqual(
+            sorted(villa.amenities.values_list("name", flat=True)), ["Pool", "Wifi"]
+        )
+        self.assertEqual(villa.photos.count(), 2)
+        self.assertEqual(villa.geohash, geohash.encode(35.1796, 129.0756))
+        self.assertEqual(models.Amenity.objects.filter(name="Wifi").count(), 1)
+
+        response = self.client.get("/api/v1/rooms/search/", {"q": "sea"})
+        self.assertEqual([room["name"] for room in response.json()], ["Seaside villa"])
+
+    def test_unknown_amenities(self):
+        record = {**self.RECORDS[1], "amenities": ["Wifi", "Sauna", "x" * 51]}
+        result = self.import_records(json.dumps(record))
+        self.assertEqual(result["created"], 0)
+        self.assertIn("amenities", result["errors"][0]["errors"])
+
+        # Only staff add amenities.
+        record["amenities"] = ["Wifi", "Sauna"]
+        result = self.import_records(json.dumps(record))
+        self.assertEqual(
+            result["errors"][0]["errors"], {"amenities": ["Amenity Sauna not found."]}
+        )
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.import_records(json.dumps(record))["created"], 1)
+        self.assertTrue(models.Amenity.objects.filter(name="Sauna").exists())
+
+    async def test_asgi_export(self):
+        await sync_to_async(create_room)(
+            self.user,
+            "Loft",
+            price=80,
+            description="Loft",
+            kind=models.Room.RoomKindChoices.PRIVATE_ROOM,
+        )
+        response = await self.async_client.get(
+            "/api/v1/rooms/export/", {"format": "ndjson"}, headers={"Trust-Me": "host"}
+        )
+        self.assertTrue(response.is_async)
+        lines = [line async for line in response.streaming_content]
+        self.assertEqual(json.loads(b"".join(lines))["name"], "Loft")
+
+    def test_export_round_trip(self):
+        self.import_records("\n".join(json.dumps(record) for record in self.RECORDS))
+        for format in ("ndjson", "csv"):
+            response = self.client.get("/api/v1/rooms/export/", {"format": format})
+            self.assertTrue(response.streaming)
+            body = b"".join(response.streaming_content)
+
+            other = User.objects.create(username=f"other-{format}")
+            self.client.force_authenticate(other)
+            result = self.import_records(body, response["Content-Type"])
+            self.assertEqual(result, {"created": 2, "failed": 0, "errors": []})
+            self.assertEqual(
+                [
+                    (room.name, room.category_id, room.amenities.count(), room.photos.count())
+                    for room in other.rooms.order_by("pk")
+                ],
+                [
+                    (room.name, room.category_id, room.amenities.count(), room.photos.count())
+                    for room in self.user.rooms.order_by("pk")
+                ],
+            )
+            self.client.force_authenticate(self.user)
+
+    def test_commands(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson", delete=False) as file:
+            file.write("\n".join(json.dumps(record) for record in self.RECORDS[:2]))
+        self.addCleanup(os.remove, file.name)
+        call_command("import_rooms", file.name, owner="host", stdout=StringIO())
+        self.assertEqual(self.user.rooms.count(), 2)
+
+        output = StringIO()
+        call_command("export_rooms", format="csv", stdout=output)
+        rows = list(csv.DictReader(StringIO(output.getvalue())))
+        self.assertEqual([row["name"] for row in rows], ["Seaside villa", "Loft"])
+        self.assertEqual(rows[0]["amenities"], "Wifi|Pool")
+
+
+class TestConditionalGet(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="test")
+        self.amenity = models.Amenity.objects.create(name="Wifi")
+        self.room = create_room(self.user)
+
+    def test_list(self):
+        url = "/api/v1/rooms/amenities/"
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        # Cached: no query at all.
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Not cached: the validators only, nothing is serialized.
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.amenity.name = "Fast wifi"
+        self.amenity.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["name"], "Fast wifi")
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_categories(self):
+        Category.objects.create(name="Beach", kind=Category.CategoryKindChoices.ROOMS)
+        response = self.client.get("/api/v1/categories/")
+        self.assertEqual(len(response.json()), 1)
+        response = self.client.get(
+            "/api/v1/categories/", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_room_detail(self):
+        url = f"/api/v1/rooms/{self.room.pk}/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Per user: is_owner and is_liked differ.
+        self.client.force_authenticate(self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["is_owner"])
+        etag = response["ETag"]
+
+        self.client.put(url, {"amenities": [self.amenity.pk]}, format="json")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["amenities"]), 1)
+        etag = response["ETag"]
+
+        self.room.reviews.create(user=self.user, payload="Good", rating=5)
+        cache.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rating"], 5)
+
+        # A new review leaves every updated_at of the payload alone.
+        self.assertNotIn("Last-Modified", response)
+        self.room.reviews.create(user=self.user, payload="Bad", rating=1)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rating"], 3)
+
+        self.assertEqual(self.client.get("/api/v1/rooms/0/").status_code, 404)
+
+    def test_room_reviews(self):
+        url = f"/api/v1/rooms/{self.room.pk}/reviews/"
+        self.room.reviews.create(user=self.user, payload="Good", rating=5)
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # The reviewer's name is part of the payload.
+        self.user.name = "Reviewer"
+        self.user.save()
+        cache.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["user"]["name"], "Reviewer")
+
+    def age_generations(self, *models):
+        # Last-Modified is in seconds: move the generations back so the
+        # next write lands in a later second.
+        cache.set_many(
+            {generation_key(model): time.time_ns() - 10**10 for model in models},
+            None,
+        )
+
+    def test_last_modified_tracks_writes(self):
+        url = f"/api/v1/rooms/{self.room.pk}/reviews/"
+        review = self.room.reviews.create(user=self.user, payload="Good", rating=5)
+        watched = [models.Room, review.__class__, User]
+
+        # A rename keeps every updated_at shown in the list.
+        self.age_generations(*watched)
+        last_modified = self.client.get(url)["Last-Modified"]
+        self.user.name = "Reviewer"
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["user"]["name"], "Reviewer")
+
+        self.age_generations(*watched)
+        last_modified = self.client.get(url)["Last-Modified"]
+        review.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+        # Amenity links have no updated_at at all.
+        url = f"/api/v1/rooms/{self.room.pk}/amenities/"
+        self.age_generations(models.Room, models.Amenity)
+        last_modified = self.client.get(url)["Last-Modified"]
+        self.client.force_authenticate(self.user)
+        self.client.put(
+            f"/api/v1/rooms/{self.room.pk}/",
+            {"amenities": [self.amenity.pk]},
+            format="json",
+        )
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_per_user_headers(self):
+        url = f"/api/v1/rooms/{self.room.pk}/"
+        self.client.force_authenticate(self.user)
+        response = self.client.get(url)
+        for header in ["Cookie", "Authorization", "Token", "Trust-Me"]:
+            self.assertIn(header, response["Vary"])
+        self.assertIn("private", response["Cache-Control"])
+
+
+class TestRoomPayloadCache(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="owner", name="Owner")
+        self.amenity = models.Amenity.objects.create(name="Wifi")
+        self.room = create_room(self.user)
+        self.room.amenities.add(self.amenity)
+        self.url = f"/api/v1/rooms/{self.room.pk}/"
+
+    def test_hot_room_takes_no_query(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()["name"], "Room")
+        self.assertFalse(response.json()["is_owner"])
+
+        # Per user fields are merged into the shared payload.
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertTrue(response.json()["is_owner"])
+        self.assertFalse(response.json()["is_liked"])
+
+    def test_invalidation(self):
+        self.client.get(self.url)
+
+        self.room.photos.create(file="https://example.com/1.jpg", description="")
+        self.assertEqual(len(self.client.get(self.url).json()["photos"]), 1)
+
+        self.amenity.name = "Fast wifi"
+        self.amenity.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()["amenities"][0]["name"], "Fast wifi")
+
+        self.user.name = "New owner"
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).json()["owner"]["name"], "New owner")
+
+        # Logins don't touch the payload.
+        self.user.save(update_fields=["last_login"])
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        self.room.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
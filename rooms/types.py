@@ -1,5 +1,4 @@
 import typing
-from django.conf import settings
 import strawberry
 from strawberry import auto
 from strawberry.types import Info
@@ -7,7 +6,6 @@ from strawberry.types import Info
 from users.types import UserType
 from reviews.types import ReviewType
 
-from wishlists.models import Wishlist
 from . import models
 
 
@@ -16,26 +14,69 @@ class RoomType:
     id: auto
     name: auto
     kind: auto
-    owner: "UserType"
+    country: auto
+    city: auto
+    price: auto
+    pet_friendly: auto
 
     @strawberry.field
-    def reviews(self, page: typing.Optional[int] = 1) -> typing.List["ReviewType"]:
-        pageSize = settings.PAGE_SIZE
-        start = (page - 1) * pageSize
-        end = start + pageSize
-        return self.reviews.all()[start:end]
+    async def owner(self, info: Info) -> "UserType":
+        return await info.context.loaders.users.load(self.owner_id)
+
+    @strawberry.field
+    async def reviews(
+        self, info: Info, page: typing.Optional[int] = 1
+    ) -> typing.List["ReviewType"]:
+        return await info.context.loaders.room_reviews.load((self.id, page))
 
     @strawberry.field
     def rating(self) -> str:
+        # Stored aggregate (or the with_rating() annotation), no query.
         return self.rating()
 
     @strawberry.field
     def is_owner(self, info: Info) -> bool:
-        return self.owner == info.context.request.user
+        return self.owner_id == info.context.request.user.pk
+
+    @strawberry.field
+    async def is_liked(self, info: Info) -> bool:
+        if hasattr(self, "is_liked"):
+            return self.is_liked
+        return await info.context.loaders.liked_rooms.load(self.id)
+
+
+@strawberry.input
+class RoomFilter:
+    city: typing.Optional[str] = None
+    country: typing.Optional[str] = None
+    min_price: typing.Optional[int] = None
+    max_price: typing.Optional[int] = None
+    kind: typing.Optional[str] = None
+    pet_friendly: typing.Optional[bool] = None
+    amenities: typing.Optional[typing.List[int]] = None
+
+
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    has_previous_page: bool
+    start_cursor: typing.Optional[str]
+    end_cursor: typing.Optional[str]
+
+
+@strawberry.type
+class RoomEdge:
+    cursor: str
+    node: RoomType
+
+
+@strawberry.type
+class RoomConnection:
+    edges: typing.List[RoomEdge]
+    page_info: PageInfo
+    rooms: strawberry.Private[typing.Any]
 
     @strawberry.field
-    def is_liked(self, info: Info) -> bool:
-        return Wishlist.objects.filter(
-            user=info.context.request.user,
-            rooms__pk=self.id,
-        ).exists()
+    async def total_count(self) -> int:
+        # Only counted when the client asks for it.
+        return await self.rooms.acount()
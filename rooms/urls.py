@@ -3,12 +3,19 @@ from . import views
 
 urlpatterns = [
     path("", views.Rooms.as_view()),
+    path("search/", views.RoomsSearch.as_view()),
+    path("nearby/", views.RoomsNearby.as_view()),
+    path("map/", views.RoomsMap.as_view()),
+    path("facets/", views.RoomsFacets.as_view()),
+    path("import/", views.RoomsImport.as_view()),
+    path("export/", views.RoomsExport.as_view()),
     path("<int:pk>/", views.RoomDetail.as_view()),
     path("<int:pk>/reviews/", views.RoomReviews.as_view()),
     path("<int:pk>/photos/", views.RoomPhotos.as_view()),
     path("<int:pk>/bookings/", views.RoomBookings.as_view()),
     path("<int:pk>/bookings/check", views.RoomBookingCheck.as_view()),
     path("<int:pk>/amenities/", views.RoomAmenities.as_view()),
+    path("bookings/calendar", views.RoomsBookingCalendar.as_view()),
     path("amenities/", views.Amenities.as_view()),
     path("amenities/<int:pk>/", views.AmenityDetail.as_view()),
 ]
@@ -1,7 +1,12 @@
+import random
+import time
+
 # Django Import
-from django.db import transaction
+from django.db import transaction, IntegrityError, OperationalError
+from django.db.models import Count, Max
 from django.conf import settings
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 # DRF Import
 from rest_framework.response import Response
@@ -12,28 +17,110 @@ from rest_framework.exceptions import (
     PermissionDenied,
 )
 from rest_framework.status import HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 
 # Model Import
 from .models import Amenity, Room
 from categories.models import Category
 from bookings.models import Booking
+from reviews.models import Review
+from users.models import User
+from bookings.availability import is_room_available, booked_ranges, lock_room
+from .search import room_index
+from .filters import get_room_filters
+from .facets import get_facets
+from .bulk import FIELDS, RoomImporter, export_rooms, read_records
+from .cache import get_room_payload
+from .catalog import amenity_catalog
+from categories.catalog import category_catalog
+from wishlists.cache import get_liked_room_ids
+
+# Common Import
+from common.paginations import paginate_by_cursor, get_page_size, get_page_number
+from common.conditional import (
+    add_validators,
+    conditional_response,
+    get_rows_version,
+    make_etag,
+    not_modified,
+)
+from common.streaming import (
+    CSVRenderer,
+    NDJSONRenderer,
+    StreamingListMixin,
+    streaming_response,
+)
 
 # Serializers Import
 from reviews.serializers import ReviewSerializer
 from medias.serializers import PhotoSerializer
 from .serializers import AmenitySerializer, RoomListSerializer, RoomDetailSerializer
-from bookings.serializers import PublicBookingSerializer, CreateRoomBookingSerializer
+from bookings.serializers import (
+    PublicBookingSerializer,
+    CreateRoomBookingSerializer,
+    DATES_TAKEN,
+)
 
 # Create your views here.
 
 
-class Rooms(APIView):
+def get_amenity_ids(amenity_ids):
+    """
+    Check a list of amenity ids against the amenity catalog. Unknown ids are
+    reported together, per id.
+    """
+    if not amenity_ids:
+        return []
+    if not isinstance(amenity_ids, list):
+        raise ParseError({"amenities": ["Expected a list of ids."]})
+    try:
+        amenity_ids = list(dict.fromkeys(int(pk) for pk in amenity_ids))
+    except (TypeError, ValueError):
+        raise ParseError({"amenities": ["Expected a list of ids."]})
+    found = amenity_catalog.in_bulk(amenity_ids)
+    missing = [pk for pk in amenity_ids if pk not in found]
+    if missing:
+        raise ParseError(
+            {"amenities": [f"Amenity {pk} not found." for pk in missing]}
+        )
+    return amenity_ids
+
+
+class Rooms(StreamingListMixin, APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
+    token_claims_auth = True
 
     def get(self, request):
-        all_rooms = Room.objects.all()
+        all_rooms = Room.objects.prefetch_related("photos")
+        response = self.stream_list(
+            request,
+            all_rooms.order_by("pk"),
+            RoomListSerializer,
+            context={"request": request},
+        )
+        if response is not None:
+            return response
+        if "cursor" in request.query_params or "page_size" in request.query_params:
+            rooms, next_cursor = paginate_by_cursor(
+                all_rooms,
+                cursor=request.query_params.get("cursor"),
+                page_size=get_page_size(
+                    request,
+                    settings.CURSOR_PAGE_SIZE,
+                    settings.MAX_PAGE_SIZE,
+                ),
+            )
+            return Response(
+                {
+                    "results": RoomListSerializer(
+                        rooms,
+                        many=True,
+                        context={"request": request},
+                    ).data,
+                    "next": next_cursor,
+                }
+            )
         return Response(
             RoomListSerializer(
                 all_rooms,
@@ -50,31 +137,86 @@ class Rooms(APIView):
             if not category_id:
                 raise ParseError("Category is required.")
             try:
-                category = Category.objects.get(pk=category_id)
+                category = category_catalog.get(category_id)
                 if category.kind == Category.CategoryKindChoices.EXPERIENCES:
                     raise ParseError("The category kind should be 'rooms'.")
             except Category.DoesNotExist:
                 raise ParseError("Category not found.")
-            try:
-                with transaction.atomic():
-                    room = serializer.save(owner=request.user, category=category)
-                    amenities = request.data.get("amenities")
-                    for amenity_id in amenities:
-                        amenity = Amenity.objects.get(pk=amenity_id)
-                        room.amenities.add(amenity)
-                    serializer = RoomDetailSerializer(
-                        room, context={"request": request}
-                    )
-                    return Response(serializer.data)
-            except Exception:
-                raise ParseError("Amenity not found.")
+            amenities = get_amenity_ids(request.data.get("amenities"))
+            with transaction.atomic():
+                room = serializer.save(owner=request.user, category=category)
+                room.amenities.add(*amenities)
+            serializer = RoomDetailSerializer(room, context={"request": request})
+            return Response(serializer.data)
         else:
             return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
 
+class RoomsSearch(APIView):
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    token_claims_auth = True
+
+    def get(self, request):
+        query = request.query_params.get("q", "")
+        if not query.strip():
+            raise ParseError("The 'q' parameter is required.")
+        page_size = get_page_size(
+            request,
+            settings.CURSOR_PAGE_SIZE,
+            settings.MAX_PAGE_SIZE,
+        )
+        start = (get_page_number(request) - 1) * page_size
+        rooms = room_index.search(Room.objects.prefetch_related("photos"), query)
+        serializer = RoomListSerializer(
+            rooms[start : start + page_size],
+            many=True,
+            context={"request": request},
+        )
+        return Response(serializer.data)
+
+
+class RoomsFacets(APIView):
+
+    def get(self, request):
+        return Response(get_facets(get_room_filters(request.query_params)))
+
+
+class RoomsImport(APIView):
+    """
+    Imports the NDJSON or CSV (Content-Type: text/csv) request body as rooms
+    of the user, reading it as a stream. See rooms.bulk for the format.
+    Only staff can add amenities this way.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        format = "csv" if "csv" in request.content_type else "ndjson"
+        importer = RoomImporter(request.user, create_amenities=request.user.is_staff)
+        return Response(importer.run(read_records(request.stream or [], format)))
+
+
+class RoomsExport(APIView):
+
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    def get(self, request):
+        rows = export_rooms(Room.objects.filter(owner=request.user))
+        return streaming_response(
+            rows,
+            request.accepted_renderer.format,
+            FIELDS,
+            filename="rooms",
+            request=request,
+        )
+
+
 class RoomDetail(APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
+    token_claims_auth = True
 
     def get_object(self, pk):
         try:
@@ -83,13 +225,27 @@ class RoomDetail(APIView):
             raise NotFound
 
     def get(self, request, pk):
-        room = self.get_object(pk)
-        return Response(
-            RoomDetailSerializer(
-                room,
-                context={"request": request},
-            ).data
+        entry = get_room_payload(pk)
+        if entry is None:
+            raise NotFound
+        is_owner = entry["owner_id"] == request.user.pk
+        is_liked = pk in get_liked_room_ids(request.user)
+        etag = make_etag(
+            "room",
+            pk,
+            entry["version"],
+            is_owner,
+            is_liked,
+            request.accepted_renderer.format,
         )
+        # ETag only: no date covers is_liked, and a Last-Modified would let
+        # If-Modified-Since alone answer 304 after a like or a new review.
+        response = not_modified(request, etag, None)
+        if response is None:
+            response = Response(
+                {**entry["data"], "is_owner": is_owner, "is_liked": is_liked}
+            )
+        return add_validators(response, etag, None, per_user=True)
 
     def put(self, request, pk):
         room = self.get_object(pk)
@@ -103,31 +259,25 @@ class RoomDetail(APIView):
             category_id = request.data.get("category")
             if category_id:
                 try:
-                    category = Category.objects.get(pk=category_id)
+                    category = category_catalog.get(category_id)
                     if category.kind == Category.CategoryKindChoices.EXPERIENCES:
                         raise ParseError("The category kind should be 'rooms'.")
                 except Category.DoesNotExist:
                     raise ParseError("Category not found.")
 
-            try:
-                with transaction.atomic():
-                    room = (
-                        serializer.save(category=category)
-                        if category_id
-                        else serializer.save()
-                    )
-                    amenities = request.data.get("amenities")
-
-                    if amenities:
-                        room.amenities.clear()
-                        for amenity_id in amenities:
-                            amenity = Amenity.objects.get(pk=amenity_id)
-                            room.amenities.add(amenity)
-
-                    return Response(RoomDetailSerializer(room).data)
-
-            except Exception:
-                raise ParseError("Amenity not found.")
+            amenities = get_amenity_ids(request.data.get("amenities"))
+            with transaction.atomic():
+                room = (
+                    serializer.save(category=category)
+                    if category_id
+                    else serializer.save()
+                )
+                if amenities:
+                    room.amenities.set(amenities)
+
+            return Response(
+                RoomDetailSerializer(room, context={"request": request}).data
+            )
 
         else:
             return Response(serializer.errors)
@@ -143,6 +293,7 @@ class RoomDetail(APIView):
 class RoomReviews(APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
+    token_claims_auth = True
 
     def get_object(self, pk):
         try:
@@ -159,8 +310,27 @@ class RoomReviews(APIView):
         start = (page - 1) * page_size
         end = start + page_size
         room = self.get_object(pk)
-        serializer = ReviewSerializer(room.reviews.all()[start:end], many=True)
-        return Response(serializer.data)
+        reviews = room.reviews.all()[start:end]
+
+        def get_version():
+            version = list(
+                reviews.values_list(
+                    "pk",
+                    "updated_at",
+                    "user__name",
+                    "user__avatar",
+                    "user__username",
+                )
+            )
+            return version
+
+        return conditional_response(
+            request,
+            ("room_reviews", pk, page),
+            [Room, Review, User],
+            get_version,
+            lambda: ReviewSerializer(reviews, many=True).data,
+        )
 
     def post(self, request, pk):
         serializer = ReviewSerializer(data=request.data)
@@ -198,6 +368,8 @@ class RoomPhotos(APIView):
 
 class RoomAmenities(APIView):
 
+    token_claims_auth = True
+
     def get_object(self, pk):
         try:
             return Room.objects.get(pk=pk)
@@ -214,13 +386,31 @@ class RoomAmenities(APIView):
         page_size = settings.PAGE_SIZE
         start = (page - 1) * page_size
         end = start + page_size
-        serializer = AmenitySerializer(room.amenities.all()[start:end], many=True)
-        return Response(serializer.data)
+
+        def get_version():
+            # The link ids change when amenities are removed and added back.
+            return Room.amenities.through.objects.filter(room=room).aggregate(
+                last_link=Max("pk"),
+                count=Count("pk"),
+                last_modified=Max("amenity__updated_at"),
+            )
+
+        return conditional_response(
+            request,
+            ("room_amenities", pk, page),
+            [Room, Amenity],
+            get_version,
+            lambda: AmenitySerializer(
+                room.amenities.all()[start:end],
+                many=True,
+            ).data,
+        )
 
 
 class RoomBookings(APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
+    token_claims_auth = True
 
     def get_object(self, pk):
         try:
@@ -241,23 +431,111 @@ class RoomBookings(APIView):
 
     def post(self, request, pk):
         room = self.get_object(pk)
-        serializer = CreateRoomBookingSerializer(
-            data=request.data, context={"room": room}
+        # The overlap check and the insert run under a lock on the room, so
+        # concurrent requests for the same room are serialized while other
+        # rooms are unaffected. Lock timeouts and serialization failures are
+        # retried with a jittered backoff.
+        for attempt in range(settings.BOOKING_MAX_RETRIES + 1):
+            try:
+                with transaction.atomic():
+                    lock_room(room)
+                    serializer = CreateRoomBookingSerializer(
+                        data=request.data, context={"room": room, "locked": True}
+                    )
+                    if not serializer.is_valid():
+                        return Response(serializer.errors)
+                    booking = serializer.save(
+                        room=room,
+                        user=request.user,
+                        kind=Booking.BookingKindChoices.ROOM,
+                    )
+                serializer = PublicBookingSerializer(booking)
+                return Response(serializer.data)
+            except IntegrityError:
+                # Rejected by the exclusion constraint.
+                return Response({"non_field_errors": [DATES_TAKEN]})
+            except OperationalError:
+                if attempt == settings.BOOKING_MAX_RETRIES:
+                    raise
+                time.sleep(random.uniform(0, 0.01 * 2**attempt))
+
+
+def get_coordinates(request, *params):
+    try:
+        return [float(request.query_params[param]) for param in params]
+    except (KeyError, ValueError):
+        raise ParseError(f"{', '.join(params)} should be numbers.")
+
+
+class RoomsNearby(APIView):
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    token_claims_auth = True
+
+    def get(self, request):
+        latitude, longitude = get_coordinates(request, "lat", "lng")
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise ParseError("lat and lng are out of range.")
+        try:
+            count = int(request.query_params.get("k", settings.CURSOR_PAGE_SIZE))
+        except ValueError:
+            raise ParseError("k should be a number.")
+        count = max(1, min(count, settings.MAX_PAGE_SIZE))
+        rooms = Room.objects.prefetch_related("photos").nearest(
+            latitude, longitude, count
         )
-        if serializer.is_valid():
-            booking = serializer.save(
-                room=room,
-                user=request.user,
-                kind=Booking.BookingKindChoices.ROOM,
+        serializer = RoomListSerializer(rooms, many=True, context={"request": request})
+        return Response(
+            [
+                {**data, "distance": round(room.distance, 3)}
+                for room, data in zip(rooms, serializer.data)
+            ]
+        )
+
+
+class RoomsMap(APIView):
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request):
+        """?bbox=west,south,east,north, the order used by map libraries."""
+        try:
+            west, south, east, north = map(
+                float, request.query_params.get("bbox", "").split(",")
             )
-            serializer = PublicBookingSerializer(booking)
-            return Response(serializer.data)
-        else:
-            return Response(serializer.errors)
+        except ValueError:
+            raise ParseError("bbox should be west,south,east,north.")
+        if (
+            not -90 <= south <= north <= 90
+            or not -180 <= west <= 180
+            or not -180 <= east <= 180
+        ):
+            raise ParseError("bbox is out of range.")
+        rooms = Room.objects.within_bbox(south, west, north, east).values(
+            "pk",
+            "name",
+            "price",
+            "latitude",
+            "longitude",
+        )
+        return Response(list(rooms[: settings.MAP_MAX_ROOMS]))
+
+
+def get_date_range(request, start_param, end_param):
+    try:
+        start = parse_date(request.query_params.get(start_param, ""))
+        end = parse_date(request.query_params.get(end_param, ""))
+    except ValueError:
+        start = end = None
+    if not start or not end:
+        raise ParseError(f"{start_param} and {end_param} should be valid dates.")
+    return start, end
 
 
 class RoomBookingCheck(APIView):
 
+    token_claims_auth = True
+
     def get_object(self, pk):
         try:
             return Room.objects.get(pk=pk)
@@ -266,27 +544,62 @@ class RoomBookingCheck(APIView):
 
     def get(self, request, pk):
         room = self.get_object(pk)
-        check_in = request.query_params.get("check_in")
-        check_out = request.query_params.get("check_out")
-        exists = Booking.objects.filter(
-            room=room,
-            check_in__lte=check_out,
-            check_out__gte=check_in,
-        ).exists()
-        if exists:
-            return Response({"ok": False})
-        return Response({"ok": True})
+        check_in, check_out = get_date_range(request, "check_in", "check_out")
+        # Bookings need check_in < check_out too.
+        if check_in >= check_out:
+            raise ParseError("Check in should be smaller than check out.")
+        return Response({"ok": is_room_available(room, check_in, check_out)})
 
 
-class Amenities(APIView):
+class RoomsBookingCalendar(APIView):
+
+    token_claims_auth = True
 
     def get(self, request):
-        all_amenities = Amenity.objects.all()
-        serializer = AmenitySerializer(
-            all_amenities,
-            many=True,
+        start, end = get_date_range(request, "start", "end")
+        if start > end:
+            raise ParseError("start should be smaller than end.")
+        if (end - start).days >= settings.CALENDAR_MAX_DAYS:
+            raise ParseError(f"The window is limited to {settings.CALENDAR_MAX_DAYS} days.")
+        try:
+            room_ids = list(
+                dict.fromkeys(
+                    int(room_id)
+                    for room_id in request.query_params.get("rooms", "").split(",")
+                    if room_id
+                )
+            )
+        except ValueError:
+            raise ParseError("rooms should be a comma separated list of ids.")
+        if not room_ids:
+            raise ParseError("rooms is required.")
+        if len(room_ids) > settings.CALENDAR_MAX_ROOMS:
+            raise ParseError(f"At most {settings.CALENDAR_MAX_ROOMS} rooms at once.")
+        return Response(
+            {
+                str(room_id): [
+                    [first_day.isoformat(), last_day.isoformat()]
+                    for first_day, last_day in ranges
+                ]
+                for room_id, ranges in booked_ranges(room_ids, start, end).items()
+            }
+        )
+
+
+class Amenities(StreamingListMixin, APIView):
+
+    def get(self, request):
+        response = self.stream_list(request, Amenity.objects.all(), AmenitySerializer)
+        if response is not None:
+            return response
+        all_amenities = amenity_catalog.all()
+        return conditional_response(
+            request,
+            ("amenities",),
+            [Amenity],
+            lambda: get_rows_version(all_amenities),
+            lambda: AmenitySerializer(all_amenities, many=True).data,
         )
-        return Response(serializer.data)
 
     def post(self, request):
         serializer = AmenitySerializer(data=request.data)
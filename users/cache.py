@@ -0,0 +1,68 @@
+import copy
+
+from django.conf import settings
+
+from common.cache import (
+    CacheNamespace,
+    LocalCache,
+    bump_object_generations,
+    get_generations,
+)
+
+from .models import User
+
+_local = LocalCache(max_size=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+_shared = CacheNamespace("users", alias=settings.USER_CACHE_ALIAS)
+
+
+def _get_generation(pk):
+    # invalidate_user() bumps it: entries cached under another generation
+    # are stale in every worker.
+    return get_generations([(User, pk)])[0]
+
+
+def get_user_by_pk(pk):
+    """
+    Like User.objects.get(pk=pk) but served from the cache when possible.
+    Every call returns a fresh copy so requests can't leak changes to
+    each other. Don't save() it: views changing the user should load it.
+    """
+    key = ("pk", pk)
+    generation = _get_generation(pk)
+    entry = _local.get(key)
+    if entry is None or entry[0] != generation:
+        entry = _shared.get(key)
+        if entry is None or entry[0] != generation:
+            entry = (generation, User.objects.get(pk=pk))
+            _shared.set(key, entry, settings.USER_CACHE_TTL)
+        _local.set(key, entry)
+    return copy.copy(entry[1])
+
+
+def get_user_by_username(username):
+    key = ("username", username)
+    pk = _local.get(key)
+    if pk is None:
+        pk = _shared.get(key)
+    if pk is not None:
+        try:
+            user = get_user_by_pk(pk)
+        except User.DoesNotExist:
+            user = None
+        # The username may have changed since it was cached.
+        if user is not None and user.username == username:
+            return user
+    user = User.objects.get(username=username)
+    # The generation is only known after the load here: a write committed
+    # in between can leave this row cached until USER_CACHE_TTL.
+    entry = (_get_generation(user.pk), user)
+    _local.set(key, user.pk)
+    _local.set(("pk", user.pk), entry)
+    _shared.set(key, user.pk, settings.USER_CACHE_TTL)
+    _shared.set(("pk", user.pk), entry, settings.USER_CACHE_TTL)
+    return copy.copy(user)
+
+
+def invalidate_user(user):
+    _local.delete(("pk", user.pk))
+    bump_object_generations(User, user.pk)
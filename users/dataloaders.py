@@ -0,0 +1,13 @@
+from asgiref.sync import sync_to_async
+
+from .models import User
+
+
+@sync_to_async
+def _get_users(pks):
+    return User.objects.in_bulk(pks)
+
+
+async def load_users(pks):
+    users = await _get_users(pks)
+    return [users.get(pk) for pk in pks]
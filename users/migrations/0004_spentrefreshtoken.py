@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-17 04:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpentRefreshToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=32, unique=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spent_refresh_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
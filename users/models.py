@@ -49,3 +49,33 @@ class User(AbstractUser):
         max_length=5,
         choices=CurrencyChoices.choices,
     )
+    token_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+
+    def revoke_tokens(self):
+        # In SQL: self may be a cached copy with an old token_version.
+        self.token_version = models.F("token_version") + 1
+        self.save(update_fields=["token_version"])
+        self.refresh_from_db(fields=["token_version"])
+
+
+class SpentRefreshToken(models.Model):
+    """
+    A refresh token already exchanged: refresh tokens are single use.
+    Rows are kept until the token would have expired anyway.
+    """
+
+    jti = models.CharField(
+        max_length=32,
+        unique=True,
+    )
+    user = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="spent_refresh_tokens",
+    )
+    expires_at = models.DateTimeField(
+        db_index=True,
+    )
@@ -27,4 +27,5 @@ class PrivateUserSerializer(ModelSerializer):
             "last_name",
             "groups",
             "user_permissions",
+            "token_version",
         )
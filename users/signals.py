@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_user
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user_on_save(sender, instance, **kwargs):
+    invalidate_user(instance)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_cached_user_on_delete(sender, instance, **kwargs):
+    invalidate_user(instance)
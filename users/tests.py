@@ -1,3 +1,151 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+import time
+
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from common.cache import generation_key
+from .cache import _local
+from .models import User
+
+
+class TestCachedAuthentication(APITestCase):
+    URL = "/api/v1/users/me/"
+
+    def setUp(self):
+        cache.clear()
+        # Primary keys aren't reused on PostgreSQL: a name cached by another
+        # test would cost a query.
+        _local.clear()
+        self.user = User.objects.create(username="test", name="Test")
+
+    def test_trust_me_authentication(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.URL, HTTP_TRUST_ME="test")
+        self.assertEqual(response.json()["name"], "Test")
+        with self.assertNumQueries(0):
+            self.client.get(self.URL, HTTP_TRUST_ME="test")
+
+        self.user.name = "Changed"
+        self.user.save()
+        response = self.client.get(self.URL, HTTP_TRUST_ME="test")
+        self.assertEqual(response.json()["name"], "Changed")
+
+        self.user.username = "renamed"
+        self.user.save()
+        response = self.client.get(self.URL, HTTP_TRUST_ME="test")
+        self.assertEqual(response.status_code, 403)
+
+    def test_other_worker_changes(self):
+        self.client.get(self.URL, HTTP_TRUST_ME="test")
+        # Another worker saves the user: only the shared generation changes.
+        User.objects.filter(pk=self.user.pk).update(name="Elsewhere")
+        cache.set(generation_key(User, self.user.pk), time.time_ns(), None)
+        response = self.client.get(self.URL, HTTP_TRUST_ME="test")
+        self.assertEqual(response.json()["name"], "Elsewhere")
+
+    def test_writes_use_fresh_rows(self):
+        self.client.get(self.URL, HTTP_TRUST_ME="test")
+        User.objects.filter(pk=self.user.pk).update(password="changed")
+        self.client.put(self.URL, {"name": "New"}, HTTP_TRUST_ME="test")
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, "New")
+        self.assertEqual(self.user.password, "changed")
+
+
+class TestJwt(APITestCase):
+    URL = "/api/v1/users/me/"
+
+    def setUp(self):
+        self.user = User.objects.create(username="test")
+        self.user.set_password("password")
+        self.user.save()
+
+    def login(self):
+        response = self.client.post(
+            "/api/v1/users/jwt-login",
+            {"username": "test", "password": "password"},
+        )
+        return response.json()
+
+    def test_jwt_authentication(self):
+        token = self.login()["token"]
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        self.assertEqual(payload["username"], "test")
+        self.assertIn("exp", payload)
+
+        self.client.get(self.URL, HTTP_TOKEN=token)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.URL, HTTP_TOKEN=token)
+        self.assertEqual(response.json()["username"], "test")
+
+        self.user.delete()
+        response = self.client.get(self.URL, HTTP_TOKEN=token)
+        self.assertEqual(response.status_code, 403)
+
+    def test_legacy_and_expired_tokens(self):
+        legacy = jwt.encode({"pk": self.user.pk}, settings.SECRET_KEY, algorithm="HS256")
+        response = self.client.get(self.URL, HTTP_TOKEN=legacy)
+        self.assertEqual(response.status_code, 403)
+
+        with self.settings(JWT_ACCESS_TOKEN_LIFETIME=timedelta(seconds=-1)):
+            expired = self.login()["token"]
+        response = self.client.get(self.URL, HTTP_TOKEN=expired)
+        self.assertEqual(response.status_code, 403)
+
+    def test_refresh_and_revoke(self):
+        tokens = self.login()
+        response = self.client.post(
+            "/api/v1/users/jwt-refresh", {"refresh": tokens["token"]}
+        )
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.post(
+            "/api/v1/users/jwt-refresh", {"refresh": tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, 200)
+        token = response.json()["token"]
+
+        response = self.client.post("/api/v1/users/jwt-revoke", HTTP_TOKEN=token)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.URL, HTTP_TOKEN=token)
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(
+            "/api/v1/users/jwt-refresh", {"refresh": tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_refresh_tokens_are_single_use(self):
+        url = "/api/v1/users/jwt-refresh"
+        refresh = self.login()["refresh"]
+        tokens = self.client.post(url, {"refresh": refresh}).json()
+        response = self.client.get(self.URL, HTTP_TOKEN=tokens["token"])
+        self.assertEqual(response.status_code, 200)
+
+        # Replayed: the token leaked, everything is revoked.
+        self.assertEqual(self.client.post(url, {"refresh": refresh}).status_code, 403)
+        response = self.client.get(self.URL, HTTP_TOKEN=tokens["token"])
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(url, {"refresh": tokens["refresh"]})
+        self.assertEqual(response.status_code, 403)
+
+    def test_revoke_stale_copy(self):
+        stale = User.objects.get(pk=self.user.pk)
+        self.user.revoke_tokens()
+        stale.revoke_tokens()
+        self.assertEqual(stale.token_version, 2)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 2)
+
+    def test_claims_authentication(self):
+        token = self.login()["token"]
+        self.user.revoke_tokens()
+        # Read-only views trust the claims until the access token expires.
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/v1/rooms/", HTTP_TOKEN=token)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post("/api/v1/rooms/", HTTP_TOKEN=token)
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,57 @@
+import uuid
+
+import jwt
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import exceptions
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+
+def encode_token(user, token_type):
+    now = timezone.now()
+    lifetime = (
+        settings.JWT_ACCESS_TOKEN_LIFETIME
+        if token_type == ACCESS
+        else settings.JWT_REFRESH_TOKEN_LIFETIME
+    )
+    payload = {
+        "pk": user.pk,
+        "type": token_type,
+        "ver": user.token_version,
+        "iat": now,
+        "exp": now + lifetime,
+    }
+    if token_type == ACCESS:
+        # Enough of a profile for read-only endpoints to skip the user lookup.
+        payload["username"] = user.username
+        payload["is_host"] = user.is_host
+    else:
+        # Identifies the refresh token once spent, see JwtRefresh.
+        payload["jti"] = uuid.uuid4().hex
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm="HS256")
+
+
+def issue_tokens(user):
+    return {
+        "token": encode_token(user, ACCESS),
+        "refresh": encode_token(user, REFRESH),
+    }
+
+
+def decode_token(token, token_type):
+    try:
+        payload = jwt.decode(
+            token,
+            settings.SECRET_KEY,
+            algorithms=["HS256"],
+            options={"require": ["exp", "iat", "pk", "type", "ver"]},
+        )
+    except jwt.ExpiredSignatureError:
+        raise exceptions.AuthenticationFailed("Token expired")
+    except jwt.InvalidTokenError:
+        raise exceptions.AuthenticationFailed("Invalid Token")
+    if payload["type"] != token_type:
+        raise exceptions.AuthenticationFailed("Invalid Token")
+    return payload
@@ -15,6 +15,8 @@ urlpatterns = [
     path("logout/", views.Logout.as_view()),
     path("token-login", obtain_auth_token),
     path("jwt-login", views.JwtLogin.as_view()),
+    path("jwt-refresh", views.JwtRefresh.as_view()),
+    path("jwt-revoke", views.JwtRevoke.as_view()),
     path("github/", views.GithubLogin.as_view()),
     path("kakao/", views.KakaoLogin.as_view()),
     path("@<str:username>/", views.PublicUser.as_view()),
@@ -1,10 +1,13 @@
 import email
-import jwt
 import requests
+from datetime import datetime, timezone as dt_timezone
 
 # Django Imports
 from django.contrib.auth import authenticate, login, logout
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
 
 # DRF Imports
 from rest_framework.views import APIView
@@ -18,6 +21,9 @@ from . import serializers as user_serial
 # Model Imports
 from . import models
 
+# Token Imports
+from .tokens import REFRESH, decode_token, issue_tokens
+
 
 class Me(APIView):
 
@@ -80,7 +86,8 @@ class ChangePassword(APIView):
             raise exceptions.ParseError
         if user.check_password(old_password):
             user.set_password(new_password)
-            user.save()
+            user.token_version = F("token_version") + 1
+            user.save(update_fields=["password", "token_version"])
             return Response(status=status.HTTP_200_OK)
         else:
             return Response(status=status.HTTP_400_BAD_REQUEST)
@@ -130,16 +137,60 @@ class JwtLogin(APIView):
             password=password,
         )
         if user:
-            token = jwt.encode(
-                {"pk": user.pk},
-                settings.SECRET_KEY,
-                algorithm="HS256",
-            )
-            return Response({"token": token})
+            return Response(issue_tokens(user))
         else:
             raise exceptions.AuthenticationFailed("Wrong Password")
 
 
+class JwtRefresh(APIView):
+    """
+    Trades a refresh token for a new pair. Each refresh token works once:
+    presenting a spent one again means it leaked, so every token of the
+    user is revoked.
+    """
+
+    authentication_classes = []
+
+    def post(self, request):
+        token = request.data.get("refresh")
+        if not token:
+            raise exceptions.ParseError
+        decoded = decode_token(token, REFRESH)
+        if "jti" not in decoded:
+            raise exceptions.AuthenticationFailed("Invalid Token")
+        try:
+            user = models.User.objects.get(pk=decoded["pk"])
+        except models.User.DoesNotExist:
+            raise exceptions.AuthenticationFailed("User not found")
+        if not user.is_active or user.token_version != decoded["ver"]:
+            raise exceptions.AuthenticationFailed("Token revoked")
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                models.SpentRefreshToken.objects.create(
+                    jti=decoded["jti"],
+                    user=user,
+                    expires_at=datetime.fromtimestamp(
+                        decoded["exp"],
+                        tz=dt_timezone.utc,
+                    ),
+                )
+        except IntegrityError:
+            user.revoke_tokens()
+            raise exceptions.AuthenticationFailed("Token revoked")
+        models.SpentRefreshToken.objects.filter(expires_at__lt=now).delete()
+        return Response(issue_tokens(user))
+
+
+class JwtRevoke(APIView):
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        request.user.revoke_tokens()
+        return Response(status=status.HTTP_200_OK)
+
+
 class GithubLogin(APIView):
     def post(self, request):
         try:
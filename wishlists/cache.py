@@ -0,0 +1,36 @@
+from django.conf import settings
+
+from common.cache import LocalCache
+
+from .models import Wishlist
+
+_liked_rooms = LocalCache(
+    max_size=settings.LIKED_ROOMS_CACHE_SIZE,
+    ttl=settings.LIKED_ROOMS_CACHE_TTL,
+)
+
+
+def get_liked_room_ids(user):
+    """
+    The ids of the rooms in any of the user's wishlists, from one query.
+    Kept in process for LIKED_ROOMS_CACHE_TTL seconds (0 disables it).
+    """
+    if user is None or not user.is_authenticated:
+        return frozenset()
+    liked = _liked_rooms.get(user.pk) if settings.LIKED_ROOMS_CACHE_TTL else None
+    if liked is None:
+        liked = frozenset(
+            Wishlist.rooms.through.objects.filter(
+                wishlist__user_id=user.pk,
+            ).values_list("room_id", flat=True)
+        )
+        if settings.LIKED_ROOMS_CACHE_TTL:
+            _liked_rooms.set(user.pk, liked)
+    return liked
+
+
+def invalidate_liked_rooms(user_id=None):
+    if user_id is None:
+        _liked_rooms.clear()
+    else:
+        _liked_rooms.delete(user_id)
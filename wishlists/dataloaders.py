@@ -0,0 +1,8 @@
+from asgiref.sync import sync_to_async
+
+from .cache import get_liked_room_ids
+
+
+async def load_liked_rooms(user, room_ids):
+    liked = await sync_to_async(get_liked_room_ids)(user)
+    return [room_id in liked for room_id in room_ids]
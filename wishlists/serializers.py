@@ -1,5 +1,5 @@
 # DRF Imports
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import ModelSerializer, PrimaryKeyRelatedField
 
 # Serializer Imports
 from rooms.serializers import RoomListSerializer
@@ -11,6 +11,7 @@ from .models import Wishlist
 class RoomsWishlistSerializer(ModelSerializer):
 
     rooms = RoomListSerializer(read_only=True, many=True)
+    experiences = PrimaryKeyRelatedField(read_only=True, many=True)
 
     class Meta:
         model = Wishlist
@@ -18,4 +19,5 @@ class RoomsWishlistSerializer(ModelSerializer):
             "pk",
             "name",
             "rooms",
+            "experiences",
         )
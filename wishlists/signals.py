@@ -0,0 +1,25 @@
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_liked_rooms
+from .models import Wishlist
+
+
+@receiver(m2m_changed, sender=Wishlist.rooms.through)
+def invalidate_liked_rooms_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidate_liked_rooms(instance.user_id)
+    elif pk_set is None:
+        # room.wishlists.clear(), the wishlists are not known anymore.
+        invalidate_liked_rooms()
+    else:
+        wishlists = Wishlist.objects.filter(pk__in=pk_set)
+        for user_id in wishlists.values_list("user_id", flat=True).distinct():
+            invalidate_liked_rooms(user_id)
+
+
+@receiver(post_delete, sender=Wishlist)
+def invalidate_liked_rooms_on_delete(sender, instance, **kwargs):
+    invalidate_liked_rooms(instance.user_id)
@@ -1,3 +1,140 @@
-from django.test import TestCase
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from experiences.models import Experience
+from medias.models import Photo
+from rooms.testing import create_room
+from users.models import User
+from .cache import invalidate_liked_rooms
+
+
+class TestLikedRooms(APITestCase):
+    def setUp(self):
+        invalidate_liked_rooms()
+        self.user = User.objects.create(username="test")
+        self.rooms = [self.create_room_with_photo(f"Room {i}") for i in range(4)]
+        for i in range(2):
+            wishlist = self.user.wishlists.create(name=f"Wishlist {i}")
+            wishlist.rooms.add(*self.rooms[i : i + 2])
+        self.client.force_authenticate(self.user)
+
+    def create_room_with_photo(self, name):
+        room = create_room(self.user, name)
+        Photo.objects.create(file="https://example.com/photo.jpg", room=room)
+        return room
+
+    def test_wishlists_queries(self):
+        # wishlists, rooms, photos, experiences, liked room ids
+        with self.assertNumQueries(5):
+            response = self.client.get("/api/v1/wishlists/")
+        rooms = [room for wishlist in response.json() for room in wishlist["rooms"]]
+        self.assertEqual(len(rooms), 4)
+        self.assertTrue(all(room["is_liked"] for room in rooms))
+
+        # The liked room ids are now cached.
+        with self.assertNumQueries(4):
+            self.client.get("/api/v1/wishlists/")
+
+    def liked(self):
+        response = self.client.get("/api/v1/rooms/")
+        return {room["name"]: room["is_liked"] for room in response.json()}
+
+    def test_rooms_is_liked(self):
+        self.assertEqual(
+            self.liked(),
+            {"Room 0": True, "Room 1": True, "Room 2": True, "Room 3": False},
+        )
+
+    def test_toggle_invalidates(self):
+        wishlist = self.user.wishlists.first()
+        url = f"/api/v1/wishlists/{wishlist.pk}/rooms/{self.rooms[3].pk}/"
+        self.assertFalse(self.liked()["Room 3"])
+        self.client.put(url)
+        self.assertTrue(self.liked()["Room 3"])
+        self.client.put(url)
+        self.assertFalse(self.liked()["Room 3"])
+
+        wishlist.delete()
+        self.assertFalse(self.liked()["Room 0"])
+
+
+class TestWishlistItems(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="test")
+        self.wishlist = self.user.wishlists.create(name="Wishlist")
+        self.rooms = [create_room(self.user, f"Room {i}") for i in range(3)]
+        self.experiences = [
+            Experience.objects.create(
+                name=f"Experience {i}",
+                country="Korea",
+                city="Seoul",
+                host=self.user,
+                price=10,
+                address="Address",
+                start="10:00",
+                end="12:00",
+                description="Description",
+            )
+            for i in range(2)
+        ]
+        self.client.force_authenticate(self.user)
+
+    def test_toggle_experience(self):
+        url = f"/api/v1/wishlists/{self.wishlist.pk}/experiences/{self.experiences[0].pk}/"
+        response = self.client.put(url)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(list(self.wishlist.experiences.all()), [self.experiences[0]])
+        self.client.put(url)
+        self.assertFalse(self.wishlist.experiences.exists())
+
+        response = self.client.put(f"/api/v1/wishlists/{self.wishlist.pk}/experiences/0/")
+        self.assertEqual(response.status_code, 404)
+        other = User.objects.create(username="other").wishlists.create(name="Other")
+        response = self.client.put(
+            f"/api/v1/wishlists/{other.pk}/experiences/{self.experiences[0].pk}/"
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_bulk(self):
+        self.wishlist.rooms.add(self.rooms[0])
+        url = f"/api/v1/wishlists/{self.wishlist.pk}/items/"
+        response = self.client.post(
+            url,
+            {
+                "add_rooms": [self.rooms[0].pk, self.rooms[1].pk, self.rooms[2].pk],
+                "add_experiences": [experience.pk for experience in self.experiences],
+            },
+            format="json",
+        )
+        self.assertEqual(len(response.json()["rooms"]), 3)
+        self.assertEqual(len(response.json()["experiences"]), 2)
+
+        response = self.client.post(
+            url,
+            {
+                "remove_rooms": [self.rooms[0].pk, self.rooms[1].pk],
+                "remove_experiences": [self.experiences[1].pk],
+            },
+            format="json",
+        )
+        self.assertEqual(
+            [room["pk"] for room in response.json()["rooms"]], [self.rooms[2].pk]
+        )
+        self.assertEqual(response.json()["experiences"], [self.experiences[0].pk])
+
+    def test_bulk_errors(self):
+        url = f"/api/v1/wishlists/{self.wishlist.pk}/items/"
+        response = self.client.post(
+            url, {"add_rooms": [self.rooms[0].pk, 0]}, format="json"
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("[0]", response.json()["detail"])
+        self.assertFalse(self.wishlist.rooms.exists())
+
+        response = self.client.post(url, {"add_rooms": "1,2"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            url,
+            {"add_rooms": [self.rooms[0].pk], "remove_rooms": [self.rooms[0].pk]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
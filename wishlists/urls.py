@@ -2,10 +2,21 @@
 from django.urls import path
 
 # View Imports
-from .views import RoomsWishlistToggle, RoomsWishlists, RoomsWishlistDetail
+from .views import (
+    ExperiencesWishlistToggle,
+    RoomsWishlistToggle,
+    RoomsWishlists,
+    RoomsWishlistDetail,
+    WishlistItems,
+)
 
 urlpatterns = [
     path("", RoomsWishlists.as_view()),
     path("<int:pk>/", RoomsWishlistDetail.as_view()),
     path("<int:pk>/rooms/<int:room_pk>/", RoomsWishlistToggle.as_view()),
+    path(
+        "<int:pk>/experiences/<int:experience_pk>/",
+        ExperiencesWishlistToggle.as_view(),
+    ),
+    path("<int:pk>/items/", WishlistItems.as_view()),
 ]
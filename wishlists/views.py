@@ -1,13 +1,22 @@
+# Django Imports
+from django.db import transaction
+from django.db.models import Exists
+
 # DRF Imports
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ParseError
 from rest_framework.status import HTTP_204_NO_CONTENT, HTTP_202_ACCEPTED
 
 # Model Imports
 from .models import Wishlist
 from rooms.models import Room
+from experiences.models import Experience
+
+# Cache Imports
+from .cache import invalidate_liked_rooms
+from common.cache import bump_generation
 
 # Serializer Imports
 from .serializers import RoomsWishlistSerializer
@@ -18,7 +27,10 @@ class RoomsWishlists(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        all_wishlists = Wishlist.objects.filter(user=request.user)
+        all_wishlists = Wishlist.objects.filter(user=request.user).prefetch_related(
+            "rooms__photos",
+            "experiences",
+        )
         serializer = RoomsWishlistSerializer(
             all_wishlists,
             many=True,
@@ -30,7 +42,7 @@ class RoomsWishlists(APIView):
         serializer = RoomsWishlistSerializer(data=request.data)
         if serializer.is_valid():
             wishlist = serializer.save(user=request.user)
-            serializer = RoomsWishlistSerializer(wishlist)
+            serializer = RoomsWishlistSerializer(wishlist, context={"request": request})
             return Response(serializer.data)
         else:
             return Response(serializer.errors)
@@ -40,14 +52,18 @@ class RoomsWishlistDetail(APIView):
 
     permission_classes = [IsAuthenticated]
 
-    def get_object(self, pk, user):
+    def get_object(self, pk, user, queryset=Wishlist.objects):
         try:
-            return Wishlist.objects.get(pk=pk, user=user)
+            return queryset.get(pk=pk, user=user)
         except Wishlist.DoesNotExist:
             raise NotFound
 
     def get(self, request, pk):
-        wishlist = self.get_object(pk, request.user)
+        wishlist = self.get_object(
+            pk,
+            request.user,
+            Wishlist.objects.prefetch_related("rooms__photos", "experiences"),
+        )
         serializer = RoomsWishlistSerializer(
             wishlist,
             context={"request": request},
@@ -68,31 +84,131 @@ class RoomsWishlistDetail(APIView):
         )
         if serializer.is_valid():
             wishlist = serializer.save()
-            serializer = RoomsWishlistSerializer(wishlist)
+            serializer = RoomsWishlistSerializer(wishlist, context={"request": request})
             return Response(serializer.data)
         else:
             return Response(serializer.errors)
 
 
-class RoomsWishlistToggle(APIView):
+class WishlistToggle(APIView):
+    """
+    Adds the item to the wishlist, or removes it when it is already there.
 
-    def get_wishlist(self, pk, user):
-        try:
-            return Wishlist.objects.get(pk=pk, user=user)
-        except Wishlist.DoesNotExist:
+    The toggle works on the M2M through table directly: one DELETE, and an
+    INSERT ignoring conflicts only when nothing was deleted, so concurrent
+    toggles cannot fail on the unique (wishlist, item) pair.
+    """
+
+    permission_classes = [IsAuthenticated]
+    field = None
+    model = None
+
+    def put(self, request, pk, item_pk):
+        item_exists = (
+            Wishlist.objects.filter(pk=pk, user=request.user)
+            .annotate(item_exists=Exists(self.model.objects.filter(pk=item_pk)))
+            .values_list("item_exists", flat=True)
+            .first()
+        )
+        if not item_exists:
             raise NotFound
+        through = getattr(Wishlist, self.field).through
+        item = {f"{self.model._meta.model_name}_id": item_pk}
+        with transaction.atomic():
+            deleted, _ = through.objects.filter(wishlist_id=pk, **item).delete()
+            if not deleted:
+                through.objects.bulk_create(
+                    [through(wishlist_id=pk, **item)],
+                    ignore_conflicts=True,
+                )
+        if self.field == "rooms":
+            invalidate_liked_rooms(request.user.pk)
+        bump_generation(Wishlist)
+        return Response(status=HTTP_202_ACCEPTED)
+
+
+class RoomsWishlistToggle(WishlistToggle):
+
+    field = "rooms"
+    model = Room
+
+    def put(self, request, pk, room_pk):
+        return super().put(request, pk, room_pk)
 
-    def get_room(self, room_pk):
+
+class ExperiencesWishlistToggle(WishlistToggle):
+
+    field = "experiences"
+    model = Experience
+
+    def put(self, request, pk, experience_pk):
+        return super().put(request, pk, experience_pk)
+
+
+def get_ids(data, key):
+    ids = data.get(key) or []
+    if not isinstance(ids, list):
+        raise ParseError(f"{key} should be a list of ids.")
+    try:
+        return {int(pk) for pk in ids}
+    except (TypeError, ValueError):
+        raise ParseError(f"{key} should be a list of ids.")
+
+
+class WishlistItems(APIView):
+    """
+    Adds and removes many rooms and experiences in one call:
+    {"add_rooms": [...], "remove_rooms": [...],
+     "add_experiences": [...], "remove_experiences": [...]}
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    ITEMS = (
+        ("rooms", Room),
+        ("experiences", Experience),
+    )
+
+    def get_object(self, pk, user):
         try:
-            return Room.objects.get(pk=room_pk)
-        except Room.DoesNotExist:
+            return Wishlist.objects.get(pk=pk, user=user)
+        except Wishlist.DoesNotExist:
             raise NotFound
 
-    def put(self, request, pk, room_pk):
-        wishlist = self.get_wishlist(pk, request.user)
-        room = self.get_room(room_pk)
-        if wishlist.rooms.filter(pk=room.pk).exists():
-            wishlist.rooms.remove(room)
-        else:
-            wishlist.rooms.add(room)
-        return Response(status=HTTP_202_ACCEPTED)
+    def post(self, request, pk):
+        wishlist = self.get_object(pk, request.user)
+        changes = []
+        for field, model in self.ITEMS:
+            add = get_ids(request.data, f"add_{field}")
+            remove = get_ids(request.data, f"remove_{field}")
+            if add & remove:
+                raise ParseError(f"Can't add and remove the same {field}.")
+            missing = add - set(
+                model.objects.filter(pk__in=add).values_list("pk", flat=True)
+            )
+            if missing:
+                raise NotFound(f"{field.title()} not found: {sorted(missing)}")
+            changes.append((field, model, add, remove))
+
+        with transaction.atomic():
+            for field, model, add, remove in changes:
+                through = getattr(Wishlist, field).through
+                column = f"{model._meta.model_name}_id"
+                if remove:
+                    through.objects.filter(
+                        wishlist=wishlist,
+                        **{f"{column}__in": remove},
+                    ).delete()
+                if add:
+                    through.objects.bulk_create(
+                        [through(wishlist=wishlist, **{column: pk}) for pk in add],
+                        ignore_conflicts=True,
+                    )
+        invalidate_liked_rooms(request.user.pk)
+        bump_generation(Wishlist)
+        wishlist = Wishlist.objects.prefetch_related(
+            "rooms__photos",
+            "experiences",
+        ).get(pk=pk)
+        serializer = RoomsWishlistSerializer(wishlist, context={"request": request})
+        return Response(serializer.data)